@@ -0,0 +1,172 @@
+import asyncio
+import time
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from douban_spider import (Book, RateLimiter, make_parser, DEFAULT_HEADERS, DEFAULT_RATE_LIMITER,
+                           SEARCH_URL, RETRY_STATUSES, search_params)
+from http_cache import ResponseCache, SEARCH_TTL, DETAIL_TTL
+
+
+class AsyncDoubanBookSpider:
+    """基于 aiohttp 的豆瓣爬虫，接口与 DoubanBookSpider 相同（方法为协程）
+
+    用法：
+        async with AsyncDoubanBookSpider(concurrency=20) as spider:
+            await spider.enrich_many(books)
+
+    concurrency 为全局并发上限，所有请求共享同一个连接池。
+    """
+
+    def __init__(self, concurrency: int = 10, timeout: float = 10, retries: int = 3,
+                 backoff_factor: float = 0.5, session: Optional[aiohttp.ClientSession] = None,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = DEFAULT_RATE_LIMITER):
+        self.headers = dict(DEFAULT_HEADERS)
+        self.base_url = SEARCH_URL
+        self.parser = make_parser()
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.session = session
+        self._own_session = session is None
+        self.cache = cache  # 与同步爬虫共用同一种持久化缓存
+        self.rate_limiter = rate_limiter  # 默认与同步爬虫共用限速器
+        self._semaphore = None
+
+    async def __aenter__(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None and self._own_session:
+            await self.session.close()
+            self.session = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # 在事件循环内首次使用时创建
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _get_text(self, url: str, params: Optional[dict] = None, ttl: float = SEARCH_TTL) -> str:
+        """GET 页面文本，429/5xx 时指数退避重试（遵守 Retry-After）；命中缓存时不访问网络"""
+        entry = key = None
+        headers = self.headers
+        if self.cache is not None:
+            key = self.cache.make_key(url, params)
+            entry = self.cache.get(key)
+            if entry is not None and entry.fresh:
+                return entry.body
+            if entry is not None:
+                headers = dict(self.headers)
+                if entry.etag:
+                    headers['If-None-Match'] = entry.etag
+                if entry.last_modified:
+                    headers['If-Modified-Since'] = entry.last_modified
+
+        host = urlsplit(url).netloc
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                if self.rate_limiter is not None:
+                    await asyncio.sleep(self.rate_limiter.reserve(host))
+                async with self.session.get(url, params=params, headers=headers, timeout=self.timeout) as response:
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.feedback(host, response.status)
+                    if response.status in RETRY_STATUSES and attempt < self.retries:
+                        retry_after = response.headers.get('Retry-After', '')
+                        delay = float(retry_after) if retry_after.isdigit() else self.backoff_factor * (2 ** attempt)
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status == 304 and entry is not None:
+                        self.cache.refresh(key, ttl)
+                        return entry.body
+                    response.raise_for_status()
+                    text = await response.text()
+                    if self.cache is not None:
+                        self.cache.put(key, text, response.headers.get('ETag', ''),
+                                       response.headers.get('Last-Modified', ''), ttl)
+                    return text
+
+    async def search_books(self, keyword: str, start: int = 0) -> List[Book]:
+        """搜索豆瓣书籍，返回Book对象列表"""
+        try:
+            html = await self._get_text(self.base_url, search_params(keyword, start), SEARCH_TTL)
+            return self.parser.parse_search_page(html)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"请求失败: {e}")
+            return []
+
+    async def get_book_details(self, book: Book) -> Book:
+        """获取书籍详细信息并更新Book对象"""
+        try:
+            return await self._fetch_details(book)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"获取书籍详情失败: {e}")
+            return book
+
+    async def _fetch_details(self, book: Book) -> Book:
+        """获取并解析详情页，失败时抛出异常"""
+        html = await self._get_text(book.url, ttl=DETAIL_TTL)
+        self.parser.parse_detail_page(book, html)
+        book.details_fetched_at = time.time()
+        return book
+
+    async def _fetch_details_safe(self, book: Book) -> Tuple[Book, Optional[Exception]]:
+        try:
+            await self._fetch_details(book)
+        except Exception as e:
+            return book, e
+        return book, None
+
+    async def enrich_many(self, books: Iterable[Book]) -> List[Tuple[Book, Optional[Exception]]]:
+        """并发获取多本书的详细信息（受全局并发上限约束），按输入顺序返回 (book, 错误)
+
+        单本失败（网络错误或页面无法解析）时错误为对应异常，不影响其他书。
+        """
+        return await asyncio.gather(*(self._fetch_details_safe(book) for book in books if book.url))
+
+if __name__ == "__main__":
+    import sys
+
+    from library_store import LibraryStore
+    from storage import open_storage
+
+    # 用法: python async_douban_spider.py [bookshelf.json] [并发数] [--log-storage]
+    # 与界面使用同一个书库（默认 bookshelf.sqlite3，首次运行时从 bookshelf.json 导入）
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    filename = args[0] if len(args) > 0 else "bookshelf.json"
+    concurrency = int(args[1]) if len(args) > 1 else 10
+    backend = "log" if "--log-storage" in sys.argv else "sqlite"
+
+    async def main():
+        storage = open_storage(json_path=filename, backend=backend)
+        library = LibraryStore(storage.load())
+        books = [book for row in library.shelves for book in row["books"]]
+        print(f"正在更新 {len(books)} 本书的详细信息（并发 {concurrency}）")
+        start = time.perf_counter()
+        async with AsyncDoubanBookSpider(concurrency=concurrency, cache=ResponseCache()) as spider:
+            results = await spider.enrich_many(books)
+        failed = [(book, error) for book, error in results if error is not None]
+        print(f"完成，用时 {time.perf_counter() - start:.1f}s，成功 {len(results) - len(failed)} 本，失败 {len(failed)} 本")
+        for book, error in failed:
+            print(f"《{book.title}》: {error}")
+        for host, stats in spider.rate_limiter.stats().items():
+            print(f"{host}: 速率 {stats['rate']}/s，请求 {stats['requests']} 次，被拒绝 {stats['rejected']} 次")
+        # 只保存成功更新的书
+        for book, error in results:
+            if error is None:
+                library.touch(book)
+        storage.save(library.shelves, library.take_changes())
+        storage.close()
+
+    asyncio.run(main())
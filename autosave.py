@@ -0,0 +1,118 @@
+import time
+
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+
+from utlis import snapshot
+from task_runner import Task
+
+AUTOSAVE_DELAY_MS = 2000  # 最后一次修改后等待多久再保存
+
+
+class AutoSaver(QObject):
+    """书架自动保存
+
+    每次修改后重新计时，停止编辑 delay_ms 毫秒后才保存，连续拖放多本书只写一次；
+    在主线程取快照（复制书架结构、取出操作日志），在单独的保存线程中序列化并写入。
+    保存进行中又有修改时只记下，当前保存完成后再合并保存一次。
+    """
+    saved = pyqtSignal(float, int)  # 耗时（秒）, 写入量
+    failed = pyqtSignal(str)
+
+    def __init__(self, storage, library, delay_ms=AUTOSAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self.library = library
+        self.saved_version = library.version
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)  # 保存按顺序进行
+        self.task = None       # 进行中的保存
+        self.pending = False   # 保存进行中时又有修改
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.save_now)
+        library.on_change = self.schedule
+
+    def is_modified(self):
+        return self.library.version != self.saved_version
+
+    def is_saving(self):
+        return self.task is not None
+
+    # 有修改时重新开始计时
+    def schedule(self):
+        self.timer.start()
+
+    def save_now(self):
+        """立即开始保存（保存进行中则在其完成后再保存一次）"""
+        self.timer.stop()
+        if self.task is not None:
+            self.pending = True
+            return
+        if not self.is_modified():
+            return
+        version = self.library.version
+        rows = snapshot(self.library.shelves)
+        changes = self.library.take_changes()
+        outcome = {}
+
+        def job(task):
+            start = time.perf_counter()
+            try:
+                written = self.storage.save(rows, changes)
+            except Exception as e:
+                outcome["error"] = e
+                raise
+            return time.perf_counter() - start, written or 0
+
+        def on_finished(result):
+            if self.task is task:
+                self._finish(version, changes, outcome)
+                self.saved.emit(*result)
+                self._save_pending()
+
+        def on_failed(error):
+            if self.task is task:
+                self._finish(version, changes, outcome)
+                self.failed.emit(error)
+                self._save_pending()
+
+        task = self.task = Task("自动保存", job)
+        task.state = (version, changes, outcome)
+        task.setAutoDelete(False)
+        task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(on_failed)
+        self.pool.start(task)
+
+    def _finish(self, version, changes, outcome):
+        self.task = None
+        if "error" in outcome:
+            self.library.changes[:0] = changes  # 放回，下次保存时重试
+        else:
+            self.saved_version = version
+
+    def _save_pending(self):
+        if self.pending:
+            self.pending = False
+            self.save_now()
+
+    def flush(self):
+        """等待进行中的保存并同步写入剩余修改（退出前调用）"""
+        self.timer.stop()
+        self.pending = False
+        if self.task is not None:
+            self.pool.waitForDone()
+            # 完成信号尚未在主线程处理，直接读取结果；之后到达的信号会被忽略
+            self._finish(*self.task.state)
+        if self.is_modified():
+            start = time.perf_counter()
+            version = self.library.version
+            changes = self.library.take_changes()
+            try:
+                written = self.storage.save(snapshot(self.library.shelves), changes)
+            except Exception:
+                self.library.changes[:0] = changes  # 放回，再次关闭时重试
+                raise
+            self.saved_version = version
+            self.saved.emit(time.perf_counter() - start, written or 0)
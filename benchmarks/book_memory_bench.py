@@ -0,0 +1,101 @@
+"""测量每本书常驻内存：普通 dataclass 与 __slots__ + 字符串驻留的 Book 对比
+
+用法: python benchmarks/book_memory_bench.py [书籍数量]
+
+模拟从 bookshelf.json 加载：先 json.loads 得到字典，转换为 Book 后丢弃字典，统计剩余内存。
+"""
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utlis
+
+
+@dataclass
+class PlainBook:
+    """原先的 dataclass 版本，作为对比基准"""
+    title: str
+    url: str
+    rating: float
+    author: str
+    publisher: str
+    cover_url: str
+    source: str
+    pub_date: str = ""
+    price: str = ""
+    info: str = ""
+    summary: str = ""
+    tags: List[str] = None
+    rating_count: int = 0
+    details_fetched_at: float = 0.0
+    isbn: str = ""
+    pages: int = 0
+    binding: str = ""
+    series: str = ""
+    translator: str = ""
+    pub_date_iso: str = ""
+    price_value: float = 0.0
+
+
+def make_json(count):
+    rng = random.Random(0)
+    authors = [f"作者{i}" for i in range(count // 20 + 1)]
+    publishers = [f"出版社{i}" for i in range(300)]
+    tags = [f"标签{i}" for i in range(500)]
+    books = []
+    for i in range(count):
+        books.append({
+            "title": f"书名{i}", "author": rng.choice(authors), "publisher": rng.choice(publishers),
+            "pub_date": f"{rng.randint(1950, 2024)}-{rng.randint(1, 12)}", "price": f"{rng.randint(10, 99)}.00元",
+            "rating": round(rng.uniform(5, 10), 1), "rating_count": rng.randint(0, 100000),
+            "summary": "简介" * rng.randint(50, 200), "info": "作者|:|某某|出版社:|某出版社" * 4,
+            "url": f"https://book.douban.com/subject/{i}/", "cover_url": f"https://img.doubanio.com/s{i}.jpg",
+            "source": "script", "tags": rng.sample(tags, 8), "isbn": f"978754424{i:04d}", "pages": 300,
+            "binding": rng.choice(["平装", "精装"]), "pub_date_iso": "2008-01", "price_value": 28.0,
+        })
+    return json.dumps(books, ensure_ascii=False)
+
+
+def measure(text, build):
+    gc.collect()
+    tracemalloc.start()
+    books = [build(data) for data in json.loads(text)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, books
+
+
+def plain_from_dict(data):
+    return PlainBook(**{name: data.get(name, "") for name in ("title", "url", "rating", "author", "publisher",
+                                                              "cover_url", "source")},
+                     **{name: data[name] for name in ("pub_date", "price", "info", "summary", "tags",
+                                                      "rating_count", "isbn", "pages", "binding",
+                                                      "pub_date_iso", "price_value")})
+
+
+def load_text(book):
+    return "", ""
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text = make_json(count)
+    cases = [
+        ("dataclass", plain_from_dict),
+        ("__slots__ + intern", utlis.book_from_dict),
+        ("__slots__ + 延迟加载简介", lambda data: utlis.book_from_dict(data, text_loader=load_text)),
+    ]
+    baseline = None
+    for name, build in cases:
+        size, books = measure(text, build)
+        baseline = baseline or size
+        print(f"{name:<24} {size / count:8.0f} 字节/本  ({size / baseline:.0%})")
+        del books
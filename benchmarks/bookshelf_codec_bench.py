@@ -0,0 +1,85 @@
+"""比较 bookshelf.json 的读写耗时：原先的 json + 逐字段转换、标准库编解码路径与 orjson 路径
+
+用法: python benchmarks/bookshelf_codec_bench.py [书籍数量] [重复次数]
+
+生成含指定数量书籍的临时书架文件，分别测量加载与保存（indent=2 格式）的最短耗时。
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utlis
+
+
+def make_bookshelf(count, shelves=20):
+    rng = random.Random(0)
+    authors = [f"作者{i}" for i in range(count // 20 + 1)]
+    publishers = [f"出版社{i}" for i in range(300)]
+    tags = [f"标签{i}" for i in range(500)]
+    rows = [{"row_name": f"书架{i}", "books": []} for i in range(shelves)]
+    for i in range(count):
+        rows[i % shelves]["books"].append(utlis.book_from_dict({
+            "title": f"书名{i}", "author": rng.choice(authors), "publisher": rng.choice(publishers),
+            "pub_date": f"{rng.randint(1950, 2024)}-{rng.randint(1, 12)}", "price": f"{rng.randint(10, 99)}.00元",
+            "rating": round(rng.uniform(5, 10), 1), "rating_count": rng.randint(0, 100000),
+            "summary": "简介" * rng.randint(20, 80), "info": "作者:|某某|出版社:|某出版社",
+            "url": f"https://book.douban.com/subject/{i}/", "cover_url": f"https://img.doubanio.com/s{i}.jpg",
+            "source": "script", "tags": rng.sample(tags, 8), "isbn": f"978754424{i:04d}", "pages": 300,
+            "binding": rng.choice(["平装", "精装"]),
+        }))
+    return rows
+
+
+# 原先的实现，作为对比基准
+def legacy_save(bookshelf, filename):
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(utlis.books_2d_to_dict(bookshelf), f, ensure_ascii=False, indent=2)
+
+
+def legacy_load(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [{"row_name": row["row_name"], "books": [utlis.book_from_dict(book) for book in row["books"]]}
+            for row in data]
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    bookshelf = make_bookshelf(count)
+    filename = os.path.join(tempfile.mkdtemp(), "bookshelf.json")
+    legacy_save(bookshelf, filename)
+    print(f"{count} 本书，文件 {os.path.getsize(filename) / 1024 / 1024:.1f} MiB")
+
+    fast_module = utlis.orjson
+    cases = [("json + book_from_dict", None, legacy_load, legacy_save),
+             ("标准库编解码", None, utlis.load_bookshelf_from_file, utlis.save_bookshelf_to_file)]
+    if fast_module is not None:
+        cases.append(("orjson", fast_module, utlis.load_bookshelf_from_file, utlis.save_bookshelf_to_file))
+    else:
+        print("未安装 orjson，只比较标准库路径")
+
+    expected = utlis.books_2d_to_dict(bookshelf)
+    for name, module, load, save in cases:
+        utlis.orjson = module
+        save_time = best_time(lambda: save(bookshelf, filename), repeat)
+        load_time = best_time(lambda: load(filename), repeat)
+        same = utlis.books_2d_to_dict(load(filename)) == expected
+        print(f"加载 {load_time * 1000:6.0f} ms   保存 {save_time * 1000:6.0f} ms   "
+              f"{'一致' if same else '不一致'}   {name}")
+    utlis.orjson = fast_module
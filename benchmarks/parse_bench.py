@@ -0,0 +1,60 @@
+"""比较 BeautifulSoup 与 lxml 解析器在已保存页面上的耗时与结果
+
+用法: python benchmarks/parse_bench.py [页面目录] [重复次数]
+
+目录中 search_*.html 按搜索结果页解析，detail_*.html 按详情页解析；
+默认使用 tests/fixtures 中保存的页面。
+"""
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from douban_spider import Book, DoubanParser, LxmlDoubanParser, lxml_html
+
+
+def load_pages(directory):
+    pages = {"search": [], "detail": []}
+    for path in sorted(Path(directory).glob("*.html")):
+        kind = "search" if path.name.startswith("search") else "detail"
+        pages[kind].append(path.read_text(encoding="utf-8"))
+    return pages
+
+
+def parse_all(parser, pages):
+    results = [parser.parse_search_page(html) for html in pages["search"]]
+    for html in pages["detail"]:
+        results.append(parser.parse_detail_page(Book("", "", 0.0, "", "", "", ""), html))
+    return results
+
+
+def bench(parser, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_all(parser, pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    if lxml_html is None:
+        sys.exit("未安装 lxml")
+    directory = sys.argv[1] if len(sys.argv) > 1 else ROOT / "tests" / "fixtures"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    pages = load_pages(directory)
+    count = len(pages["search"]) + len(pages["detail"])
+    if not count:
+        sys.exit(f"{directory} 中没有 .html 页面")
+
+    soup_parser, lxml_parser = DoubanParser(), LxmlDoubanParser()
+    same = parse_all(soup_parser, pages) == parse_all(lxml_parser, pages)
+    print(f"{len(pages['search'])} 个搜索页, {len(pages['detail'])} 个详情页，提取结果{'一致' if same else '不一致'}")
+
+    soup_time = bench(soup_parser, pages, repeat)
+    lxml_time = bench(lxml_parser, pages, repeat)
+    print(f"BeautifulSoup: {soup_time / count * 1000:.2f} ms/页")
+    print(f"lxml:          {lxml_time / count * 1000:.2f} ms/页")
+    print(f"加速 {soup_time / lxml_time:.1f}x")
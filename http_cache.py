@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+SEARCH_TTL = 24 * 3600        # 搜索结果页缓存一天
+DETAIL_TTL = 7 * 24 * 3600    # 详情页缓存一周
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+ACCESS_FLUSH_SIZE = 256       # 攒够多少次命中再写回访问时间
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: str
+    last_modified: str
+    fresh: bool  # 未过期，可直接使用；过期的条目可带校验头重新验证
+
+
+class ResponseCache:
+    """基于 SQLite 的 HTTP 响应缓存
+
+    键为规范化后的 URL（含排序后的查询参数）；条目过期后若有 ETag/Last-Modified，
+    可发送条件请求，收到 304 时继续使用缓存内容。总大小超出 max_bytes 时按最近访问时间淘汰。
+    命中时只在内存中记下访问时间，攒够一批、写入新条目或关闭时再一起写回。
+    可在多个线程间共享。
+    """
+
+    def __init__(self, path="cache/douban_http.sqlite3", max_bytes=CACHE_MAX_BYTES):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.accessed = {}  # 尚未写回的访问时间：键 -> 时间
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None) -> str:
+        """规范化 URL：协议与主机小写、去掉片段、合并并排序查询参数"""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params:
+            query.extend((str(k), str(v)) for k, v in params.items())
+        query.sort()
+        path = parts.path or "/"
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.accessed[key] = now
+            if len(self.accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self.conn.commit()
+        body, etag, last_modified, expires_at = row
+        return CachedResponse(body, etag, last_modified, expires_at > now)
+
+    def put(self, key: str, body: str, etag: str = "", last_modified: str = "", ttl: float = SEARCH_TTL):
+        now = time.time()
+        size = len(body.encode("utf-8"))
+        with self.lock:
+            self._flush_accessed()
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, expires_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag or "", last_modified or "", now + ttl, now, size)
+            )
+            self.total_bytes += size - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    # 条件请求返回 304：内容未变，只延长有效期
+    def refresh(self, key: str, ttl: float = SEARCH_TTL):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key)
+            )
+            self.conn.commit()
+
+    # 把内存中的访问时间写入数据库（调用方持有锁并负责提交）
+    def _flush_accessed(self):
+        if self.accessed:
+            self.conn.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                  [(at, key) for key, at in self.accessed.items()])
+            self.accessed.clear()
+
+    # 按最近访问时间淘汰，直到降到上限的 90%
+    def _evict(self):
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.total_bytes = 0
+            self.accessed.clear()
+
+    def close(self):
+        with self.lock:
+            self._flush_accessed()
+            self.conn.commit()
+            self.conn.close()
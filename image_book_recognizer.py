@@ -10,6 +10,7 @@ from PIL import Image
 import openai  # 使用 openai>=1.0 客户端调用 Gemini 兼容端点
 
 from douban_spider import DoubanBookSpider
+from http_cache import ResponseCache
 
 # ------------------------------------------------------------------
 # 配置区
@@ -83,7 +84,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     img_path = sys.argv[1]
-    spider = DoubanBookSpider()
+    spider = DoubanBookSpider(cache=ResponseCache())
 
     try:
         books_info = gemini_vision_books(img_path)
@@ -97,19 +98,17 @@ if __name__ == "__main__":
         books_info = []
 
     print("\n=== 执行豆瓣搜索 ===")
-    for idx, info in enumerate(books_info, 1):
-        title = info.get("title", "").strip()
-        publisher = info.get("publisher", "").strip()
-        query = f"{title} {publisher}".strip()
-        print(f"[DEBUG] 查询豆瓣: {query}")
-        books = spider.search_books(query)
-        print(f"[DEBUG] 搜索到 {len(books)} 条结果 (max {MAX_DOUBAN_RET})")
-        if not books:
-            books = spider.search_books(title)
-            print(f"[DEBUG] 仅用书名搜索，结果数: {len(books)}")
-
-        if books:
-            bk = spider.get_book_details(books[0])
+    queries = [
+        (info.get("title", "").strip(), info.get("publisher", "").strip())
+        for info in books_info
+    ]
+
+    def on_progress(done, total, title, bk):
+        print(f"[DEBUG] ({done}/{total}) 完成查询: {title}")
+
+    matched = spider.match_books_many(queries, progress=on_progress)
+    for (title, _), bk in zip(queries, matched):
+        if bk:
             print(f"》{bk.title} | 作者: {bk.author} | 出版社: {bk.publisher} | 评分: {bk.rating}\n")
         else:
             print(f"‼ 未找到: {title}\n")
\ No newline at end of file
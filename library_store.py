@@ -0,0 +1,353 @@
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from douban_spider import Book, collation_key, to_float
+
+
+# 可按列向量化排序的字段；书名使用 Book.title_key
+COLUMN_SORT_FIELDS = ("author", "publisher", "pub_date_iso", "price_value", "rating", "rating_count", "pages")
+
+
+def date_to_int(pub_date_iso: str) -> int:
+    """"2008-01" -> 20080100，缺失的月、日记为 00，与字符串比较的顺序一致；无日期为 0"""
+    if not pub_date_iso:
+        return 0
+    parts = pub_date_iso.split("-")
+    try:
+        year = int(parts[0])
+        month = int(parts[1]) if len(parts) > 1 else 0
+        day = int(parts[2]) if len(parts) > 2 else 0
+    except ValueError:
+        return 0
+    return year * 10000 + month * 100 + day
+
+
+# 字典编码：字符串 <-> 整数编码
+class StringDictionary:
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+        self._ranks = None  # 编码 -> 按排序规则的名次，按需计算
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self._ranks = None
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def ranks(self) -> np.ndarray:
+        """各编码按 collation_key 排序后的名次，用于把编码列转换为可排序的整数"""
+        if self._ranks is None:
+            order = sorted(range(len(self.values)), key=lambda code: collation_key(self.values[code]))
+            ranks = np.empty(len(self.values), dtype=np.int32)
+            ranks[order] = np.arange(len(self.values), dtype=np.int32)
+            self._ranks = ranks
+        return self._ranks
+
+
+class LibraryStore:
+    """列式书库：books_2d 的唯一写入入口
+
+    每本书占一个槽位，评分、评价人数、价格（分）、出版日期、页数存为 NumPy 列，
+    作者、出版社、标签做字典编码；书架成员是槽位下标数组。
+    shelves（即 MainWindow.books_2d）中每行的 "books" 列表由成员数组生成，供界面直接读取，
+    因此修改书架必须调用本类的方法，修改书籍字段后需调用 touch。
+    每次修改 version 加一，比较版本号即可判断是否有未保存的改动；
+    同时把操作记入 changes，供追加式日志（utlis.BookshelfLog）只保存改动部分。
+    """
+
+    def __init__(self, books_2d: Optional[List[dict]] = None):
+        self.books: List[Optional[Book]] = []  # 槽位 -> Book，删除后为 None
+        self.slot_of: Dict[int, int] = {}      # id(book) -> 槽位
+        self.authors = StringDictionary()
+        self.publishers = StringDictionary()
+        self.tags = StringDictionary()
+        self.book_tags: List[Optional[np.ndarray]] = []  # 槽位 -> 标签编码数组
+
+        capacity = 64
+        self.rating = np.zeros(capacity, dtype=np.float64)
+        self.rating_count = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.int64)  # 以分为单位
+        self.date = np.zeros(capacity, dtype=np.int32)
+        self.pages = np.zeros(capacity, dtype=np.int32)
+        self.author = np.zeros(capacity, dtype=np.int32)
+        self.publisher = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.shelves: List[dict] = []
+        self.members: List[np.ndarray] = []  # 与 shelves 一一对应
+        self.version = 0
+        self.changes: List[dict] = []  # 上次 take_changes 之后的操作，见 utlis.apply_op
+        self.on_change: Optional[Callable[[], None]] = None  # 每次修改后调用（自动保存）
+        for row in books_2d or []:
+            self.add_shelf(row["row_name"], row["books"], row)
+        self.version = 0  # 初始数据不算改动
+        self.changes = []
+
+    # 记录一次修改；op 为 None 时只递增版本号
+    def _record(self, op: Optional[dict] = None):
+        if op is not None:
+            self.changes.append(op)
+        self.version += 1
+        if self.on_change is not None:
+            self.on_change()
+
+    def take_changes(self) -> List[dict]:
+        """取出并清空尚未保存的操作"""
+        changes, self.changes = self.changes, []
+        return changes
+
+    # 当前槽位总数（含已删除）
+    @property
+    def size(self) -> int:
+        return len(self.books)
+
+    def _ensure_capacity(self, needed: int):
+        capacity = len(self.rating)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("rating", "rating_count", "price", "date", "pages", "author", "publisher", "alive"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    # 写入一本书的各列
+    def _encode(self, slot: int, book: Book):
+        self.rating[slot] = to_float(book.rating)
+        self.rating_count[slot] = int(to_float(book.rating_count))
+        self.price[slot] = round(book.price_value * 100)
+        self.date[slot] = date_to_int(book.pub_date_iso)
+        self.pages[slot] = book.pages or 0
+        self.author[slot] = self.authors.encode(book.author)
+        self.publisher[slot] = self.publishers.encode(book.publisher)
+        self.book_tags[slot] = np.array([self.tags.encode(tag) for tag in book.tags], dtype=np.int32)
+        self.alive[slot] = True
+
+    def _add_books(self, books: Iterable[Book]) -> np.ndarray:
+        books = list(books)
+        start = self.size
+        self._ensure_capacity(start + len(books))
+        for slot, book in enumerate(books, start):
+            self.books.append(book)
+            self.book_tags.append(None)
+            self.slot_of[id(book)] = slot
+            self._encode(slot, book)
+        return np.arange(start, start + len(books), dtype=np.int64)
+
+    def _drop_slots(self, slots: np.ndarray):
+        for slot in slots:
+            book = self.books[slot]
+            del self.slot_of[id(book)]
+            self.books[slot] = None
+            self.book_tags[slot] = None
+        self.alive[slots] = False
+        # 已删除槽位过多时整理，避免列无限增长
+        if self.size > 64 and np.count_nonzero(self.alive[:self.size]) < self.size // 2:
+            self.compact()
+
+    # 根据成员数组重建该行的书籍列表（原地修改，保持列表对象不变）
+    def _sync_shelf(self, row: int):
+        books = self.books
+        self.shelves[row]["books"][:] = [books[slot] for slot in self.members[row]]
+
+    # 重新分配槽位，去掉已删除的书
+    def compact(self):
+        live = np.flatnonzero(self.alive[:self.size])
+        remap = np.full(self.size, -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        for name in ("rating", "rating_count", "price", "date", "pages", "author", "publisher", "alive"):
+            column = getattr(self, name)
+            compacted = np.zeros(max(64, len(live) * 2), dtype=column.dtype)
+            compacted[:len(live)] = column[live]
+            setattr(self, name, compacted)
+        self.books = [self.books[slot] for slot in live]
+        self.book_tags = [self.book_tags[slot] for slot in live]
+        self.slot_of = {id(book): slot for slot, book in enumerate(self.books)}
+        self.members = [remap[members] for members in self.members]
+
+    # ---- 书架操作 ----
+
+    def add_shelf(self, name: str, books: Iterable[Book] = (), row: Optional[dict] = None) -> dict:
+        """在末尾新建书架，返回书架字典"""
+        if row is None:
+            row = {"row_name": name, "books": []}
+        books = list(books)
+        self.shelves.append(row)
+        self.members.append(self._add_books(books))
+        self._sync_shelf(len(self.shelves) - 1)
+        self._record({"op": "add_shelf", "name": name, "books": books})
+        return row
+
+    def rename_shelf(self, row: int, name: str):
+        self.shelves[row]["row_name"] = name
+        self._record({"op": "rename_shelf", "row": row, "name": name})
+
+    def delete_shelf(self, row: int):
+        """删除书架及其中所有书"""
+        members = self.members.pop(row)
+        del self.shelves[row]
+        self._drop_slots(members)
+        self._record({"op": "delete_shelf", "row": row})
+
+    def merge_shelf(self, row: int, target: int):
+        """把 row 的书追加到 target 末尾，并删除 row"""
+        self.members[target] = np.concatenate([self.members[target], self.members[row]])
+        self._sync_shelf(target)
+        del self.members[row]
+        del self.shelves[row]
+        self._record({"op": "merge_shelf", "row": row, "target": target})
+
+    # ---- 书籍操作 ----
+
+    def insert_books(self, row: int, col: int, books: Iterable[Book]):
+        """在 row 行第 col 本之前插入新书"""
+        books = list(books)
+        slots = self._add_books(books)
+        self.members[row] = np.insert(self.members[row], col, slots)
+        self._sync_shelf(row)
+        self._record({"op": "insert", "row": row, "col": col, "books": books})
+
+    def remove_book(self, row: int, col: int) -> Book:
+        members = self.members[row]
+        slot = members[col]
+        book = self.books[slot]
+        self.members[row] = np.delete(members, col)
+        self._sync_shelf(row)
+        self._drop_slots(np.array([slot]))
+        self._record({"op": "remove", "row": row, "col": col})
+        return book
+
+    def move_book(self, from_pos, to_pos):
+        """把 from_pos 的书移动到 to_pos 之前（行内向后移动时自动修正目标位置）"""
+        from_row, from_col = from_pos
+        to_row, to_col = to_pos
+        op = {"op": "move", "from": [int(from_row), int(from_col)], "to": [int(to_row), int(to_col)]}
+        slot = self.members[from_row][from_col]
+        self.members[from_row] = np.delete(self.members[from_row], from_col)
+        if from_row == to_row and from_col < to_col:
+            to_col -= 1
+        to_col = max(0, min(to_col, len(self.members[to_row])))
+        self.members[to_row] = np.insert(self.members[to_row], to_col, slot)
+        self._sync_shelf(from_row)
+        if to_row != from_row:
+            self._sync_shelf(to_row)
+        self._record(op)
+
+    def touch(self, book: Book):
+        """书籍字段（评分、标签等）被修改后更新对应的列"""
+        book.invalidate_title_key()
+        slot = self.slot_of.get(id(book))
+        if slot is None:
+            self._record()
+            return
+        self._encode(slot, book)
+        for row, members in enumerate(self.members):
+            cols = np.flatnonzero(members == slot)
+            if len(cols):
+                self._record({"op": "update", "row": row, "col": int(cols[0]), "book": book})
+                break
+        else:
+            self._record()
+
+    # ---- 排序、筛选与统计 ----
+
+    def column_key(self, field: str, slots: np.ndarray) -> np.ndarray:
+        """取若干槽位在某字段上的可排序数值"""
+        if field == "author":
+            return self.authors.ranks()[self.author[slots]]
+        if field == "publisher":
+            return self.publishers.ranks()[self.publisher[slots]]
+        if field == "pub_date_iso":
+            return self.date[slots]
+        if field == "price_value":
+            return self.price[slots]
+        if field == "pages":
+            return self.pages[slots]
+        if field == "rating_count":
+            return self.rating_count[slots]
+        return self.rating[slots]
+
+    def sort_shelf(self, row: int, field: str, reverse: bool = False):
+        """稳定排序一行书架；降序时相等的书保持原有先后顺序（与 list.sort(reverse=True) 一致）"""
+        members = self.members[row]
+        if field in COLUMN_SORT_FIELDS:
+            keys = self.column_key(field, members)
+            order = np.argsort(-keys if reverse else keys, kind="stable")
+        else:
+            books = self.books
+            order = np.array(
+                sorted(range(len(members)), key=lambda i: books[members[i]].title_key(), reverse=reverse),
+                dtype=np.int64
+            )
+        self.members[row] = members[order]
+        self._sync_shelf(row)
+        self._record({"op": "sort", "row": row, "order": order.tolist()})
+
+    def live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.alive[:self.size])
+
+    def filter(self, min_rating: Optional[float] = None, author: Optional[str] = None,
+               publisher: Optional[str] = None, tag: Optional[str] = None,
+               year_from: Optional[int] = None, year_to: Optional[int] = None) -> List[Book]:
+        """按条件筛选整个书库，返回符合条件的书"""
+        n = self.size
+        mask = self.alive[:n].copy()
+        if min_rating is not None:
+            mask &= self.rating[:n] >= min_rating
+        if author is not None:
+            mask &= self.author[:n] == self.authors.codes.get(author, -1)
+        if publisher is not None:
+            mask &= self.publisher[:n] == self.publishers.codes.get(publisher, -1)
+        if year_from is not None:
+            mask &= self.date[:n] >= year_from * 10000
+        if year_to is not None:
+            mask &= (self.date[:n] > 0) & (self.date[:n] < (year_to + 1) * 10000)
+        if tag is not None:
+            # 把候选书的标签展开成 (槽位, 标签编码) 两列后比较
+            candidates = np.flatnonzero(mask)
+            tag_lists = [self.book_tags[slot] for slot in candidates]
+            mask[:] = False
+            if tag_lists:
+                owners = np.repeat(candidates, [len(tags) for tags in tag_lists])
+                codes = np.concatenate(tag_lists)
+                mask[owners[codes == self.tags.codes.get(tag, -1)]] = True
+        return [self.books[slot] for slot in np.flatnonzero(mask)]
+
+    def stats(self, top: int = 5) -> dict:
+        """整个书库的统计信息"""
+        slots = self.live_slots()
+        rated = slots[self.rating[slots] > 0]
+        priced = slots[self.price[slots] > 0]
+        dated = slots[self.date[slots] > 0]
+
+        def top_values(codes, dictionary):
+            if not len(codes):
+                return []
+            counts = np.bincount(codes, minlength=len(dictionary.values))
+            order = np.argsort(-counts, kind="stable")[:top]
+            return [(dictionary.decode(code), int(counts[code])) for code in order
+                    if counts[code] and dictionary.decode(code)]
+
+        tag_codes = [self.book_tags[slot] for slot in slots]
+        all_tags = np.concatenate(tag_codes) if tag_codes else np.zeros(0, dtype=np.int32)
+        return {
+            "books": len(slots),
+            "shelves": len(self.shelves),
+            "mean_rating": float(self.rating[rated].mean()) if len(rated) else 0.0,
+            "rating_histogram": np.bincount(self.rating[rated].astype(np.int64), minlength=11)[1:].tolist(),
+            "total_price": int(self.price[priced].sum()) / 100,
+            "oldest_year": int(self.date[dated].min() // 10000) if len(dated) else 0,
+            "newest_year": int(self.date[dated].max() // 10000) if len(dated) else 0,
+            "top_authors": top_values(self.author[slots], self.authors),
+            "top_publishers": top_values(self.publisher[slots], self.publishers),
+            "top_tags": top_values(all_tags, self.tags),
+        }
@@ -9,7 +9,12 @@ from mainwindow import MainWindow
 if __name__ == "__main__":
     app = QApplication(sys.argv)
 
-    win = MainWindow()
+    # --model-view：使用模型/视图渲染书架，适合超大书库
+    # --log-storage：用 bookshelf.json 快照 + 追加式操作日志保存书架
+    # --no-virtual-rows：行书架为每本书创建控件（不按可见范围虚拟化）
+    win = MainWindow(model_view="--model-view" in sys.argv,
+                     storage_backend="log" if "--log-storage" in sys.argv else "sqlite",
+                     virtual_rows="--no-virtual-rows" not in sys.argv)
     win.resize(1300, 1000)
     win.show()
     sys.exit(app.exec())
\ No newline at end of file
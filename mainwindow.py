@@ -1,42 +1,61 @@
-import json
-import os
-import copy
 
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QEvent
 from PyQt6.QtGui import QKeySequence, QShortcut, QIcon, QFont, QAction
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QMainWindow, QLabel, QPushButton, QScrollArea, QVBoxLayout, QHBoxLayout,
-    QFrame, QMenu, QMessageBox, QLineEdit, QFileDialog, QSizePolicy, QToolBar, QToolButton, QInputDialog
+    QFrame, QMenu, QMessageBox, QLineEdit, QFileDialog, QSizePolicy, QToolBar, QToolButton, QInputDialog,
+    QProgressBar
 )
 
-import utlis
-from douban_spider import DoubanBookSpider
+from douban_spider import DoubanBookSpider, DETAIL_FIELDS, needs_details
+from http_cache import ResponseCache
+from library_store import LibraryStore
+from storage import open_storage
+from autosave import AutoSaver
+from task_runner import TaskRunner
 from widgets.book_row_widget import BookRowWidget
+from widgets.virtual_book_row_widget import VirtualBookRowWidget
+from widgets.shelf_slot import ShelfSlot
+from widgets.book_list_view import BookListView
+from widgets.cover_loader import get_cover_loader
+from widgets.filter_dialog import FilterDialog
 
 
 
 
 # 主窗口类
 class MainWindow(QMainWindow):
-    def __init__(self):
+    ROW_HEIGHT = 220       # 每个书架行的固定高度
+    ROW_SPACING = 20
+    RELEASE_DISTANCE = 3   # 离开视口超过几个视口高度的书架会被释放
+
+    def __init__(self, model_view=False, storage_backend="sqlite", virtual_rows=True):
         super().__init__()
         self.setWindowTitle("我的书架")
 
         self.edit_mode = False
+        self.virtual_rows = virtual_rows  # 行书架只为可见范围创建书籍控件；否则每本书一个控件，刷新时跨行复用
+        self.model_view = model_view  # 使用模型/视图 + 委托绘制代替每本书一个控件
         self.sort_ascending_per_row = {}
-        self.spider = DoubanBookSpider()
-
-        # 加载json文件中的书架数据
-        try:
-            self.books_2d = utlis.load_bookshelf_from_file()
-        except FileNotFoundError:
-            self.books_2d = []
-
-        pure_data = utlis.books_2d_to_dict(self.books_2d)
-        self.original_bookshelf_data = copy.deepcopy(pure_data)
+        self.shelf_slots = {}  # id(书架字典) -> 书架占位，刷新时按身份复用
+        self.spider = DoubanBookSpider(cache=ResponseCache())
+        # 封面下载与豆瓣请求共用同一个连接池
+        get_cover_loader().session = self.spider.session
+
+        # 加载书架数据（默认 SQLite 书库，首次运行时自动导入 bookshelf.json；"log" 为快照 + 操作日志）
+        self.storage = open_storage(backend=storage_backend)
+        books_2d = self.storage.load()
+        # 所有增删改都通过 self.library；self.books_2d 是它维护的只读视图
+        self.library = LibraryStore(books_2d)
+        self.books_2d = self.library.shelves
+        # 修改后自动在后台保存；Ctrl+S 立即保存
+        self.autosaver = AutoSaver(self.storage, self.library, parent=self)
+
+        self.task_runner = TaskRunner(self)
 
         self.init_ui()
         self.setup_toolbar()
+        self.setup_statusbar()
         self.setup_shortcuts()
 
 
@@ -44,38 +63,20 @@ class MainWindow(QMainWindow):
         self.scroll = QScrollArea()
         self.container = QWidget()
         self.v_layout = QVBoxLayout(self.container)
-        self.v_layout.setSpacing(20)
+        self.v_layout.setSpacing(self.ROW_SPACING)
         self.scroll.setWidgetResizable(True)
         self.scroll.setWidget(self.container)
         self.setCentralWidget(self.scroll)
 
-        for row_index, row_data in enumerate(self.books_2d):
-            row_name = row_data["row_name"]
-            row_books = row_data["books"]
-            row_widget = self.create_named_book_row(row_name, row_books, row_index)
-            self.v_layout.addWidget(row_widget)
-
-        # 添加“新建书架”按钮
-        add_row = QHBoxLayout()
-        btn_add_shelf = QPushButton("➕")
-        btn_add_shelf.setFixedHeight(40)
-        btn_add_shelf.setStyleSheet("""
-            QPushButton {
-                font-size: 16px;
-                padding: 8px 20px;
-                border: 2px dashed #888;
-                background-color: #f0f0f0;
-            }
-            QPushButton:hover {
-                background-color: #ddd;
-            }
-        """)
-        btn_add_shelf.clicked.connect(self.show_create_bookshelf_dialog)
-        add_row.addWidget(btn_add_shelf)
-        add_row.addStretch()
-        self.v_layout.addLayout(add_row)
+        # 滚动或视口尺寸变化时按需创建/释放书架行
+        self.scroll.verticalScrollBar().valueChanged.connect(self.update_visible_shelves)
+        self.scroll.viewport().installEventFilter(self)
 
+        # 添加“新建书架”按钮，书架行始终插在它之前
+        self.add_add_shelf_button()
         self.v_layout.addStretch(1)
+
+        self.refresh_view()
         
 
     # 编辑行书架名称
@@ -83,7 +84,7 @@ class MainWindow(QMainWindow):
         current_name = self.books_2d[row_index]["row_name"]
         new_name, ok = QInputDialog.getText(self, "修改分类名称", "请输入新名称:", text=current_name)
         if ok and new_name.strip():
-            self.books_2d[row_index]["row_name"] = new_name.strip()
+            self.library.rename_shelf(row_index, new_name.strip())
             self.refresh_view()
     
 
@@ -130,6 +131,15 @@ class MainWindow(QMainWindow):
 
         upload_action = QAction("上传图片识别", self)
         upload_action.triggered.connect(self.upload_image_and_add_book)
+
+        details_action = QAction("补全详情", self)
+        details_action.triggered.connect(self.fill_missing_details)
+
+        stats_action = QAction("统计", self)
+        stats_action.triggered.connect(self.show_library_stats)
+
+        filter_action = QAction("筛选", self)
+        filter_action.triggered.connect(self.show_filter_dialog)
         
 
         # 添加到工具栏
@@ -138,53 +148,92 @@ class MainWindow(QMainWindow):
         toolbar.addWidget(search_button)
         toolbar.addWidget(self.edit_button)
         toolbar.addAction(upload_action)
+        toolbar.addAction(details_action)
+        toolbar.addAction(stats_action)
+        toolbar.addAction(filter_action)
         
 
+    # 状态栏：后台任务进度与取消按钮
+    def setup_statusbar(self):
+        self.task_progress_bar = QProgressBar()
+        self.task_progress_bar.setFixedWidth(160)
+        self.task_progress_bar.setTextVisible(False)
+        self.task_cancel_button = QPushButton("取消")
+        self.task_cancel_button.clicked.connect(self.task_runner.cancel_all)
+        self.statusBar().addPermanentWidget(self.task_progress_bar)
+        self.statusBar().addPermanentWidget(self.task_cancel_button)
+        self.task_progress_bar.hide()
+        self.task_cancel_button.hide()
+
+        self.task_runner.task_started.connect(self.on_task_started)
+        self.task_runner.task_progress.connect(self.on_task_progress)
+        self.task_runner.task_stopped.connect(self.on_task_stopped)
+        self.autosaver.saved.connect(self.on_autosaved)
+        self.autosaver.failed.connect(lambda error: self.statusBar().showMessage(f"保存失败：{error}", 5000))
+
+    def on_task_started(self, description):
+        self.task_progress_bar.setRange(0, 0)  # 总数未知时显示忙碌状态
+        self.task_progress_bar.show()
+        self.task_cancel_button.setEnabled(True)
+        self.task_cancel_button.show()
+        self.statusBar().showMessage(f"{description}…")
+
+    def on_task_progress(self, done, total, text):
+        if total > 0:
+            self.task_progress_bar.setRange(0, total)
+            self.task_progress_bar.setValue(done)
+        if text:
+            self.statusBar().showMessage(text)
+
+    def on_task_stopped(self, message):
+        if not self.task_runner.is_busy():
+            self.task_progress_bar.hide()
+            self.task_cancel_button.hide()
+        self.statusBar().showMessage(message, 3000)
+
+    # 在后台运行 fn(task)，on_finished(result) 在主线程执行
+    def run_task(self, description, fn, on_finished):
+        if self.task_runner.is_busy():
+            QMessageBox.information(self, "提示", "已有任务正在进行，请稍候或先取消。")
+            return
+        self.task_runner.start(
+            description, fn, on_finished,
+            on_failed=lambda error: QMessageBox.critical(self, "错误", f"处理失败：{error}")
+        )
+
     # 快捷键
     def setup_shortcuts(self):
         shortcut = QShortcut(QKeySequence("Ctrl+S"), self)
         shortcut.activated.connect(self.save_bookshelf)
 
-    # 保存当前书架
+    # 保存当前书架（在后台线程写入，完成后在状态栏显示耗时）
     def save_bookshelf(self):
-        utlis.save_bookshelf_to_file(self.books_2d)
-        print("书架已保存。")
-        self.statusBar().showMessage("书架已保存", 3000)
+        self.autosaver.save_now()
 
-
-    def is_bookshelf_modified(self):
-        """比较内存数据和磁盘数据是否一致，返回True表示有改动"""
-        if not os.path.exists('bookshelf.json'):
-            return bool(self.books_2d)
-
-        try:
-            with open('bookshelf.json', 'r', encoding='utf-8') as f:
-                file_data = json.load(f)
-        except Exception:
-            return True
-        pure_data = utlis.books_2d_to_dict(self.books_2d)
-        return file_data != self.books_2d
+    def on_autosaved(self, seconds, written):
+        self.statusBar().showMessage(f"书架已保存（{seconds * 1000:.0f} ms）", 3000)
 
 
     # 退出程序
     def closeEvent(self, event):
-        if self.is_bookshelf_modified():
+        # 修改已自动保存，这里只需等待进行中的保存并写入最后一次计时内的修改，
+        # 再关闭存储（等待后台合并日志完成）
+        try:
+            self.autosaver.flush()
+            self.storage.close()
+        except Exception as e:
             reply = QMessageBox.question(
                 self,
                 "退出确认",
-                "是否在退出前保存书架？",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+                f"保存书架失败：{e}\n是否仍要退出？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel
             )
-
-            if reply == QMessageBox.StandardButton.Yes:
-                self.save_bookshelf()
-                event.accept()
-            elif reply == QMessageBox.StandardButton.No:
-                event.accept()
-            else:  # Cancel
+            if reply != QMessageBox.StandardButton.Yes:
                 event.ignore()
-        else:
-            event.accept()
+                return
+        # 写入缓存中尚未提交的访问时间
+        self.spider.cache.close()
+        event.accept()
 
     # 行书架图形化
     def create_named_book_row(self, row_name, books_1d, row_index):
@@ -207,7 +256,7 @@ class MainWindow(QMainWindow):
         # 书架名称编辑按钮
         edit_button = QPushButton("✎")
         edit_button.setFixedSize(20, 20)
-        edit_button.clicked.connect(lambda _, i=row_index: self.edit_row_name(i))
+        edit_button.clicked.connect(lambda _: self.edit_row_name(row_widget.row_index))
 
         # 删除书架按钮（小×）
         delete_button = QPushButton("×")
@@ -225,7 +274,7 @@ class MainWindow(QMainWindow):
             }
         """)
         delete_button.setToolTip("删除当前书架")
-        delete_button.clicked.connect(lambda _, i=row_index: self.confirm_delete_bookshelf(i))
+        delete_button.clicked.connect(lambda _: self.confirm_delete_bookshelf(row_widget.row_index))
 
         # 排序按钮
         sort_button = QPushButton("排序")
@@ -240,13 +289,13 @@ class MainWindow(QMainWindow):
         order_button.setCheckable(True)
         order_button.setToolTip("切换升序 / 降序")
 
-        if row_index not in self.sort_ascending_per_row:
-            self.sort_ascending_per_row[row_index] = True
+        # 行号在刷新时可能变化，闭包中统一读取 row_widget.row_index
         def update_order_button():
-            order_button.setText("↑" if self.sort_ascending_per_row[row_index] else "↓")
-        update_order_button()
+            ascending = self.sort_ascending_per_row.setdefault(row_widget.row_index, True)
+            order_button.setText("↑" if ascending else "↓")
         def toggle_order():
-            self.sort_ascending_per_row[row_index] = not self.sort_ascending_per_row[row_index]
+            row_index = row_widget.row_index
+            self.sort_ascending_per_row[row_index] = not self.sort_ascending_per_row.get(row_index, True)
             update_order_button()
         order_button.clicked.connect(toggle_order)
 
@@ -260,8 +309,9 @@ class MainWindow(QMainWindow):
             ("标题", "title"),
             ("作者", "author"),
             ("出版社", "publisher"),
-            ("出版日期", "pub_date"),
-            ("价格", "price"),
+            ("出版日期", "pub_date_iso"),
+            ("价格", "price_value"),
+            ("页数", "pages"),
             ("评分", "rating"),
             ("评价人数", "rating_count"),
         ]
@@ -269,25 +319,14 @@ class MainWindow(QMainWindow):
         def on_sort_triggered(field_key):
             def sorter():
                 try:
+                    row_index = row_widget.row_index
                     ascending = self.sort_ascending_per_row.get(row_index, True)
                     reverse = not ascending
-                    if field_key in ("rating", "rating_count"):
-                        self.books_2d[row_index]["books"].sort(
-                            key=lambda b: float(getattr(b, field_key, 0)) if getattr(b, field_key, None) not in (None, '') else 0,
-                            reverse=reverse
-                        )
-                    elif field_key == "pub_date":
-                        # 假设日期格式可直接字符串比较
-                        self.books_2d[row_index]["books"].sort(
-                            key=lambda b: getattr(b, field_key, ""),
-                            reverse=reverse
-                        )
-                    else:
-                        self.books_2d[row_index]["books"].sort(
-                            key=lambda b: getattr(b, field_key, "").lower() if getattr(b, field_key, None) else "" ,
-                            reverse=reverse
-                        )
-                    self.refresh_view()
+                    # 数值、日期、作者等按列向量化排序，书名使用 Book 上缓存的排序键；
+                    # 排序是稳定的，先后按不同字段排序即得多级排序
+                    self.library.sort_shelf(row_index, field_key, reverse)
+                    # 只重排本行的书籍控件
+                    self.refresh_shelf(row_index)
                 except Exception as e:
                     print("排序出错:", e)
             return sorter
@@ -333,32 +372,111 @@ class MainWindow(QMainWindow):
         label_layout.addWidget(sort_widget)
         label_layout.addStretch()
 
-        # 生成左侧滚动区
-        row_scroll = QScrollArea()
-        row_scroll.setWidgetResizable(True)
-        row_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        row_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        row_scroll.setFixedHeight(220)  
+        if self.model_view:
+            # 列表视图自带滚动条
+            row_container = BookListView(row_index, books_1d, self)
+            row_container.setFixedHeight(self.ROW_HEIGHT)
+            row_scroll = row_container
+        else:
+            # 生成左侧滚动区
+            row_scroll = QScrollArea()
+            row_scroll.setWidgetResizable(True)
+            row_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+            row_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+            row_scroll.setFixedHeight(self.ROW_HEIGHT)
+
+            row_class = VirtualBookRowWidget if self.virtual_rows else BookRowWidget
+            row_container = row_class(row_index, books_1d, self)
+            row_scroll.setWidget(row_container)
 
-        row_container = BookRowWidget(row_index, books_1d, self)
-        row_scroll.setWidget(row_container)
-        
         h_layout.addLayout(label_layout)
         h_layout.addWidget(row_scroll)
 
+        row_widget.row_index = row_index
+        row_widget.name_label = name_label
+        row_widget.row_container = row_container
+        row_widget.update_order_button = update_order_button
+        update_order_button()
+
         return row_widget
-            
-    # 刷新书架窗口
-    def refresh_view(self):
-        utlis.clear_layout(self.v_layout)
 
-        for row_index, row_data in enumerate(self.books_2d):
-            row_name = row_data["row_name"]
-            row_books = row_data["books"]
-            row_widget = self.create_named_book_row(row_name, row_books, row_index)
-            self.v_layout.addWidget(row_widget)
-        self.add_add_shelf_button()
+    # 复用行书架控件时同步行号与名称
+    def update_named_book_row(self, row_widget, row_data, row_index):
+        row_widget.row_index = row_index
+        row_widget.row_container.row_index = row_index
+        row_widget.name_label.setText(row_data["row_name"])
+        row_widget.update_order_button()
 
+    # 刷新书架窗口：对比 books_2d 与现有控件，只增删、移动发生变化的部分
+    def refresh_view(self):
+        # 收集所有已创建的书籍控件，按书籍身份跨行复用
+        book_widget_pool = {}
+        for slot in self.shelf_slots.values():
+            if slot.row_widget is not None:
+                book_widget_pool.update(slot.row_widget.row_container.book_widget_map())
+
+        new_slots = {}
+        ordered_slots = []
+        for row_index, row_data in enumerate(self.books_2d):
+            slot = self.shelf_slots.get(id(row_data))
+            if slot is None:
+                slot = ShelfSlot(row_data, row_index, self.ROW_HEIGHT)
+            else:
+                slot.row_index = row_index
+                if slot.row_widget is not None:
+                    self.update_named_book_row(slot.row_widget, row_data, row_index)
+                    slot.row_widget.row_container.refresh_row(row_data["books"], book_widget_pool)
+            new_slots[id(row_data)] = slot
+            ordered_slots.append(slot)
+
+        # 删除已不存在的书籍和书架
+        for book_widget in book_widget_pool.values():
+            book_widget.deleteLater()
+        for key, slot in self.shelf_slots.items():
+            if key not in new_slots:
+                self.v_layout.removeWidget(slot)
+                slot.deleteLater()
+        self.shelf_slots = new_slots
+
+        # 仅移动位置发生变化的书架
+        for row_index, slot in enumerate(ordered_slots):
+            if self.v_layout.indexOf(slot) != row_index:
+                self.v_layout.removeWidget(slot)
+                self.v_layout.insertWidget(row_index, slot)
+
+        self.update_visible_shelves()
+
+    # 为视口附近的书架创建行控件，释放远离视口的书架
+    def update_visible_shelves(self):
+        viewport_height = max(self.scroll.viewport().height(), self.ROW_HEIGHT)
+        top = self.scroll.verticalScrollBar().value() - self.v_layout.contentsMargins().top()
+        bottom = top + viewport_height
+        stride = self.ROW_HEIGHT + self.ROW_SPACING
+
+        # 书架高度固定，可直接算出可见范围（前后各多留一行）
+        first = max(0, top // stride - 1)
+        last = min(len(self.books_2d), bottom // stride + 2)
+        release_top = top - self.RELEASE_DISTANCE * viewport_height
+        release_bottom = bottom + self.RELEASE_DISTANCE * viewport_height
+
+        for slot in self.shelf_slots.values():
+            if slot.row_widget is None:
+                continue
+            y = slot.row_index * stride
+            if y + self.ROW_HEIGHT < release_top or y > release_bottom:
+                slot.release()
+
+        for row_index in range(first, last):
+            row_data = self.books_2d[row_index]
+            slot = self.shelf_slots.get(id(row_data))
+            if slot is not None and slot.row_widget is None:
+                row_widget = self.create_named_book_row(row_data["row_name"], row_data["books"], row_index)
+                slot.set_row_widget(row_widget)
+
+    def eventFilter(self, obj, event):
+        if obj is self.scroll.viewport() and event.type() == QEvent.Type.Resize:
+            self.update_visible_shelves()
+        return super().eventFilter(obj, event)
 
     # 变动书籍位置
     def insert_book(self, from_pos, to_pos):
@@ -371,27 +489,21 @@ class MainWindow(QMainWindow):
         if not (0 <= from_col < len(self.books_2d[from_row]["books"])):
             return
 
-        
-        book = self.books_2d[from_row]["books"].pop(from_col)
-        if from_row == to_row and from_col < to_col:
-            to_col -= 1
-
-        to_col = max(0, min(to_col, len(self.books_2d[to_row]["books"])))
-        self.books_2d[to_row]["books"].insert(to_col, book)
-
+        self.library.move_book(from_pos, to_pos)
         self.refresh_view()
 
 
     # 删除书籍
     def remove_book(self, row, col):
         if 0 <= row < len(self.books_2d) and 0 <= col < len(self.books_2d[row]["books"]):
-            self.books_2d[row]["books"].pop(col)
+            self.library.remove_book(row, col)
+            self.refresh_shelf(row)
 
-            row_widget = self.v_layout.itemAt(row).widget()
-            h_layout = row_widget.layout()
-            row_scroll = h_layout.itemAt(1).widget() 
-            row_container = row_scroll.widget() 
-            row_container.refresh_row(self.books_2d[row]["books"])
+    # 只刷新一行书架（未创建行控件时无需处理）
+    def refresh_shelf(self, row):
+        slot = self.shelf_slots[id(self.books_2d[row])]
+        if slot.row_widget is not None:
+            slot.row_widget.row_container.refresh_row(self.books_2d[row]["books"])
 
     # 搜索按钮激活函数
     def on_search_book(self):
@@ -400,68 +512,151 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "请输入关键词")
             return
 
-        # 爬取数据
-        books = self.spider.search_books(keyword)
-        if not books:
-            QMessageBox.information(self, "结果", "未找到相关书籍")
-            return
+        # 爬取数据（后台线程）
+        def job(task):
+            task.report_progress(0, 2, f"正在搜索：{keyword}")
+            books = self.spider.search_books(keyword)
+            if not books or task.is_cancelled():
+                return None
+            task.report_progress(1, 2, f"正在获取详情：{books[0].title}")
+            return self.spider.get_book_details(books[0])
+
+        # 修改书架（主线程）
+        def on_finished(book):
+            if book is None:
+                QMessageBox.information(self, "结果", "未找到相关书籍")
+                return
 
-        book = self.spider.get_book_details(books[0])
+            # 若没有书架，新建书架
+            if not self.books_2d:
+                self.library.add_shelf("默认书架")
 
-        # 若没有书架，新建书架
-        if not self.books_2d:
-            self.books_2d.append({
-                "row_name": "默认书架",
-                "books": []
-            })
+            self.library.insert_books(0, 0, [book])
+            self.refresh_view()
 
-        self.books_2d[0]["books"].insert(0, book)
-        self.refresh_view()
+        self.run_task("搜索图书", job, on_finished)
     
     # 编辑模式
     def toggle_edit_mode(self, checked):
         self.edit_mode = checked
 
-    # 上传图片（demo）
-    
+    # 上传图片，识别书脊后批量添加
     def upload_image_and_add_book(self):
-        from image_book_recognizer import gemini_vision_books
-        from douban_spider import DoubanBookSpider
-
         file_path, _ = QFileDialog.getOpenFileName(self, "选择书脊照片", "", "Images (*.png *.jpg *.jpeg)")
         if not file_path:
             return  # 用户取消
+        if not self.books_2d:
+            QMessageBox.warning(self, "添加失败", "当前书架为空。")
+            return
 
-        try:
-            # 1. 调用 Gemini 获取识别结果
+        # 识别与搜索（后台线程）
+        def job(task):
+            # 1. 调用 Gemini 获取识别结果（模块导入时也会访问网络）
+            task.report_progress(0, 0, "正在识别图片…")
+            from image_book_recognizer import gemini_vision_books
             books_info = gemini_vision_books(file_path)
-            if not books_info:
+            if not books_info or task.is_cancelled():
+                return [], []
+
+            # 2. 并发搜索豆瓣并获取所有识别结果的详细信息
+            queries = [
+                (info.get("title", "").strip(), info.get("publisher", "").strip())
+                for info in books_info
+            ]
+
+            def on_progress(done, total, title, book):
+                state = "已找到" if book else "未找到"
+                task.report_progress(done, total, f"正在匹配图书 {done}/{total}：{title}（{state}）")
+
+            results = self.spider.match_books_many(queries, progress=on_progress, should_stop=task.is_cancelled)
+            return queries, results
+
+        # 3. 按识别顺序一次性添加到书架第一排最前面，只刷新一次（主线程）
+        def on_finished(outcome):
+            queries, results = outcome
+            if not queries:
                 QMessageBox.warning(self, "识别失败", "没有识别到书籍信息。")
                 return
-
-            # 2. 调用豆瓣爬虫获取图书详细信息
-            spider = DoubanBookSpider()
-            first = books_info[0]
-            query = f"{first.get('title', '')} {first.get('publisher', '')}".strip()
-            search_results = spider.search_books(query)
-            if not search_results:
-                search_results = spider.search_books(first.get("title", ""))
-            if not search_results:
+            found = [book for book in results if book is not None]
+            missing = [title for (title, _), book in zip(queries, results) if book is None]
+            if not found:
                 QMessageBox.information(self, "未找到", "未找到匹配图书。")
                 return
+            if not self.books_2d:
+                QMessageBox.warning(self, "添加失败", "当前书架为空。")
+                return
 
-            book = spider.get_book_details(search_results[0])
+            self.library.insert_books(0, 0, found)
+            self.refresh_view()
+            self.statusBar().showMessage(f"已添加 {len(found)} 本图书", 3000)
 
-            # 3. 添加到书架第一排第一个位置
-            if self.books_2d:
-                self.books_2d[0]["books"].insert(0, book)
-                self.refresh_view()
-                QMessageBox.information(self, "添加成功", f"已添加图书：{book.title}")
-            else:
-                QMessageBox.warning(self, "添加失败", "当前书架为空。")
+            message = f"已添加 {len(found)} 本图书：" + "、".join(book.title for book in found)
+            if missing:
+                message += f"\n未找到 {len(missing)} 本：" + "、".join(missing)
+            QMessageBox.information(self, "添加成功", message)
 
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"处理失败：{e}")
+        self.run_task("识别图片", job, on_finished)
+
+    # 为缺少简介、标签、评分人数（或详情已过期）的书补全详情
+    def fill_missing_details(self):
+        books = [book for row in self.books_2d for book in row["books"] if needs_details(book)]
+        if not books:
+            self.statusBar().showMessage("所有图书的详情都是最新的", 3000)
+            return
+
+        # 后台线程只修改副本，完成后在主线程写回，避免界面读到一半更新的数据
+        def job(task):
+            # 详情页会整体覆盖 info/summary，副本不必从书库加载原文本
+            fetched_books = [book.copy(with_text=False) for book in books]
+            originals = {id(fetched): book for fetched, book in zip(fetched_books, books)}
+            updated, failed = [], []
+            results = self.spider.get_book_details_many(fetched_books, should_stop=task.is_cancelled)
+            for done, (fetched, error) in enumerate(results, 1):
+                if error is None:
+                    updated.append((originals[id(fetched)], fetched))
+                else:
+                    failed.append(fetched.title)
+                task.report_progress(done, len(fetched_books), f"正在补全详情 {done}/{len(fetched_books)}：{fetched.title}")
+            return updated, failed
+
+        def on_finished(outcome):
+            updated, failed = outcome
+            for book, fetched in updated:
+                for field in DETAIL_FIELDS:
+                    if field not in ("info", "summary"):
+                        setattr(book, field, getattr(fetched, field))
+                book.set_text(fetched.info, fetched.summary)  # 不触发原文本的加载
+                self.library.touch(book)
+            message = f"已补全 {len(updated)} 本图书的详情"
+            if failed:
+                message += f"，{len(failed)} 本失败"
+            self.statusBar().showMessage(message, 5000)
+
+        self.run_task("补全详情", job, on_finished)
+
+    # 书库统计（在列式存储上向量化计算）
+    def show_library_stats(self):
+        stats = self.library.stats()
+
+        def join(pairs):
+            return "、".join(f"{name}（{count}）" for name, count in pairs) or "无"
+
+        histogram = "  ".join(f"{score}分:{count}" for score, count in enumerate(stats["rating_histogram"], 1) if count)
+        years = f"{stats['oldest_year']}–{stats['newest_year']}" if stats["oldest_year"] else "无"
+        QMessageBox.information(self, "书库统计", (
+            f"共 {stats['shelves']} 个书架，{stats['books']} 本书\n"
+            f"平均评分：{stats['mean_rating']:.2f}\n"
+            f"评分分布：{histogram or '无'}\n"
+            f"总价：{stats['total_price']:.2f} 元\n"
+            f"出版年份：{years}\n"
+            f"常见作者：{join(stats['top_authors'])}\n"
+            f"常见出版社：{join(stats['top_publishers'])}\n"
+            f"常见标签：{join(stats['top_tags'])}"
+        ))
+
+    # 按评分、作者、出版社、标签、年份筛选整个书库
+    def show_filter_dialog(self):
+        FilterDialog(self.library, self).exec()
 
     # 新建书架按钮激活函数
     def show_create_bookshelf_dialog(self):
@@ -471,11 +666,7 @@ class MainWindow(QMainWindow):
 
     # 新建书架
     def add_new_bookshelf(self, name):
-        new_row_data = {
-            "row_name": name,
-            "books": []
-        }
-        self.books_2d.append(new_row_data)
+        self.library.add_shelf(name)
         self.refresh_view()
 
     def add_add_shelf_button(self):
@@ -529,7 +720,6 @@ class MainWindow(QMainWindow):
     
     def merge_bookshelf_adjacent(self, row_index):
         total_shelves = len(self.books_2d)
-        current_books = self.books_2d[row_index]["books"]
 
         if row_index == 0:
             # 第一个书架，合并到第二个书架尾端
@@ -541,12 +731,11 @@ class MainWindow(QMainWindow):
             # 中间书架，默认合并到前一个书架尾端（你可以改成后一个）
             target_index = row_index - 1
 
-        self.books_2d[target_index]["books"].extend(current_books)
-        del self.books_2d[row_index]
+        self.library.merge_shelf(row_index, target_index)
         self.refresh_view()
     
     def delete_bookshelf(self, row_index):
         # 删除当前书架
-        del self.books_2d[row_index]
+        self.library.delete_shelf(row_index)
         self.refresh_view()
 
@@ -0,0 +1,398 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Tuple
+
+import utlis
+from douban_spider import Book
+
+
+# 书籍表中除 info/summary 外的列（长文本按需加载）
+BOOK_COLUMNS = ('title', 'url', 'rating', 'author', 'publisher', 'cover_url', 'source',
+                'pub_date', 'price', 'rating_count', 'details_fetched_at', 'isbn', 'pages',
+                'binding', 'series', 'translator', 'pub_date_iso', 'price_value')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shelves (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    rating REAL,
+    author TEXT NOT NULL DEFAULT '',
+    publisher TEXT NOT NULL DEFAULT '',
+    cover_url TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    pub_date TEXT NOT NULL DEFAULT '',
+    price TEXT NOT NULL DEFAULT '',
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    details_fetched_at REAL NOT NULL DEFAULT 0,
+    isbn TEXT NOT NULL DEFAULT '',
+    pages INTEGER NOT NULL DEFAULT 0,
+    binding TEXT NOT NULL DEFAULT '',
+    series TEXT NOT NULL DEFAULT '',
+    translator TEXT NOT NULL DEFAULT '',
+    pub_date_iso TEXT NOT NULL DEFAULT '',
+    price_value REAL NOT NULL DEFAULT 0,
+    info TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT ''
+);
+-- 书架中书籍的顺序
+CREATE TABLE IF NOT EXISTS shelf_books (
+    shelf_id INTEGER NOT NULL REFERENCES shelves(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    PRIMARY KEY (shelf_id, position)
+);
+CREATE TABLE IF NOT EXISTS book_tags (
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (book_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books(title);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books(author);
+CREATE INDEX IF NOT EXISTS idx_books_rating ON books(rating);
+CREATE INDEX IF NOT EXISTS idx_book_tags_tag ON book_tags(tag);
+CREATE INDEX IF NOT EXISTS idx_shelf_books_book ON shelf_books(book_id);
+"""
+
+
+# 整文件读写 bookshelf.json（原有格式）
+class JsonStorage:
+    def __init__(self, filename="bookshelf.json"):
+        self.filename = filename
+
+    def load(self):
+        return utlis.load_bookshelf_from_file(self.filename)
+
+    def save(self, books_2d, changes=None):
+        utlis.save_bookshelf_to_file(books_2d, self.filename)
+
+
+
+# utlis.snapshot 产生的书架通过 "shelf" 指向原书架字典，按原书架对应数据库行
+def _shelf_of(row):
+    return row.get("shelf", row)
+
+
+def _book_row(book: Book) -> tuple:
+    return tuple(getattr(book, name) for name in BOOK_COLUMNS)
+
+
+class SqliteStorage:
+    """SQLite 书库：书、书架、书架内顺序、标签分表存储
+
+    保存时只写入与上次加载/保存相比有变化的行，并在同一个事务中完成；
+    加载时不读取 info/summary，首次访问时再按书单独查询。
+    书与书架按对象身份对应到数据库行，因此同一个实例应一直使用同一份 books_2d（或它的 utlis.snapshot）。
+    同一时间只应有一个线程调用 save。
+    """
+
+    def __init__(self, path="bookshelf.sqlite3"):
+        self.path = path
+        self.lock = threading.Lock()  # 延迟加载可能发生在后台线程
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        # id(对象) -> (对象, 行 id, 指纹)；持有对象引用保证 id 不被复用
+        self.books: Dict[int, Tuple[Book, int, int]] = {}
+        self.book_keys: Dict[int, int] = {}  # 行 id -> id(对象)
+        self.text_fingerprints: Dict[int, int] = {}  # 行 id -> hash((info, summary))，仅已加载的书
+        self.shelves: Dict[int, Tuple[dict, int, tuple]] = {}  # 书架指纹为 (位置, 名称, 书的行 id 元组)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # ---- 读取 ----
+
+    def load(self):
+        with self.lock:
+            conn = self.conn
+            books = {}
+            for row in conn.execute(f"SELECT id, {', '.join(BOOK_COLUMNS)} FROM books"):
+                books[row[0]] = Book(*row[1:8], pub_date=row[8], price=row[9], rating_count=row[10],
+                                     details_fetched_at=row[11], isbn=row[12], pages=row[13],
+                                     binding=row[14], series=row[15], translator=row[16],
+                                     pub_date_iso=row[17], price_value=row[18],
+                                     text_loader=self._load_text)
+            for book_id, tag in conn.execute("SELECT book_id, tag FROM book_tags ORDER BY book_id, position"):
+                books[book_id].tags.append(tag)
+            members = {}
+            for shelf_id, book_id in conn.execute("SELECT shelf_id, book_id FROM shelf_books ORDER BY shelf_id, position"):
+                members.setdefault(shelf_id, []).append(book_id)
+            shelf_rows = conn.execute("SELECT id, name FROM shelves ORDER BY position").fetchall()
+
+        self.books = {id(book): (book, book_id, hash((_book_row(book), tuple(book.tags))))
+                      for book_id, book in books.items()}
+        self.book_keys = {book_id: id(book) for book_id, book in books.items()}
+        self.text_fingerprints = {}
+        self.shelves = {}
+        books_2d = []
+        for position, (shelf_id, name) in enumerate(shelf_rows):
+            book_ids = tuple(members.get(shelf_id, ()))
+            row = {"row_name": name, "books": [books[book_id] for book_id in book_ids]}
+            self.shelves[id(row)] = (row, shelf_id, (position, name, book_ids))
+            books_2d.append(row)
+        return books_2d
+
+    # Book 的 text_loader：首次访问 info/summary 时查询
+    def _load_text(self, book):
+        entry = self.books.get(id(book))
+        if entry is None:
+            return "", ""
+        with self.lock:
+            row = self.conn.execute("SELECT info, summary FROM books WHERE id = ?", (entry[1],)).fetchone()
+        if row is None:
+            return "", ""
+        self.text_fingerprints[entry[1]] = hash(row)
+        return row
+
+    # ---- 写入 ----
+
+    def _diff(self, books_2d):
+        """比较内存中的书架与上次同步的状态，返回需要执行的变更"""
+        new_books, changed_books, changed_text, seen_books = [], [], [], set()
+        for row in books_2d:
+            for book in row["books"]:
+                seen_books.add(id(book))
+                entry = self.books.get(id(book))
+                if entry is None:
+                    new_books.append(book)
+                    continue
+                _, book_id, fingerprint = entry
+                if hash((_book_row(book), tuple(book.tags))) != fingerprint:
+                    changed_books.append((book, book_id))
+                if book.text_loaded and hash((book.info, book.summary)) != self.text_fingerprints.get(book_id):
+                    changed_text.append((book, book_id))
+        deleted_books = [entry[1] for key, entry in self.books.items() if key not in seen_books]
+
+        seen_shelves = {id(_shelf_of(row)) for row in books_2d}
+        deleted_shelves = [entry[1] for key, entry in self.shelves.items() if key not in seen_shelves]
+        return new_books, changed_books, changed_text, deleted_books, deleted_shelves
+
+    def _diff_changes(self, books_2d, changes):
+        """根据 LibraryStore 的操作日志只检查涉及的书与书架，返回值同 _diff 外加需要检查的书架位置；
+        日志与当前状态对不上时返回 None，由调用方退回完整比较"""
+        dirty = [False] * len(self.shelves)  # 按位置标记书架是否可能变化
+        updated = {}
+        try:
+            for op in changes:
+                kind = op["op"]
+                if kind == "update":
+                    updated[id(op["book"])] = op["book"]
+                elif kind == "add_shelf":
+                    dirty.append(True)
+                elif kind in ("delete_shelf", "merge_shelf"):
+                    if kind == "merge_shelf":
+                        dirty[op["target"]] = True
+                    del dirty[op["row"]]
+                    # 后面的书架位置前移
+                    dirty[op["row"]:] = [True] * (len(dirty) - op["row"])
+                elif kind == "move":
+                    dirty[op["from"][0]] = dirty[op["to"][0]] = True
+                else:  # insert、remove、sort、rename_shelf
+                    dirty[op["row"]] = True
+        except IndexError:
+            return None
+        if len(dirty) != len(books_2d):
+            return None
+        positions = [position for position, flag in enumerate(dirty) if flag]
+
+        # 变化的书架原有的书减去它们现在的书，再加上被删除书架的书，即被删除的书
+        old_ids, current_ids, new_books = set(), set(), []
+        for position in positions:
+            row = books_2d[position]
+            entry = self.shelves.get(id(_shelf_of(row)))
+            if entry is not None:
+                old_ids.update(entry[2][2])
+            for book in row["books"]:
+                book_entry = self.books.get(id(book))
+                if book_entry is None:
+                    new_books.append(book)
+                else:
+                    current_ids.add(book_entry[1])
+        live_shelves = {id(_shelf_of(row)) for row in books_2d}
+        deleted_shelves = []
+        for key, entry in self.shelves.items():
+            if key not in live_shelves:
+                deleted_shelves.append(entry[1])
+                old_ids.update(entry[2][2])
+        deleted_books = list(old_ids - current_ids)
+
+        deleted = set(deleted_books)
+        changed_books, changed_text = [], []
+        for book in updated.values():
+            entry = self.books.get(id(book))
+            if entry is None or entry[1] in deleted:
+                continue
+            _, book_id, fingerprint = entry
+            if hash((_book_row(book), tuple(book.tags))) != fingerprint:
+                changed_books.append((book, book_id))
+            if book.text_loaded and hash((book.info, book.summary)) != self.text_fingerprints.get(book_id):
+                changed_text.append((book, book_id))
+        return new_books, changed_books, changed_text, deleted_books, deleted_shelves, positions
+
+    def save(self, books_2d, changes=None):
+        """在一个事务中写入所有变化，返回写入的行数
+
+        传入 LibraryStore 的操作日志 changes 时只检查其中涉及的书与书架；
+        未传入或日志与当前状态对不上时比较整个书库。
+        """
+        diff = self._diff_changes(books_2d, changes) if changes is not None else None
+        if diff is None:
+            diff = self._diff(books_2d) + (range(len(books_2d)),)
+        new_books, changed_books, changed_text, deleted_books, deleted_shelves, positions = diff
+        written = 0
+        # 内存映射的更新先记在局部变量里，事务提交成功后才生效；回滚时保持与数据库一致
+        books, fingerprints, shelves = {}, {}, {}
+        with self.lock:
+            with self.conn:
+                conn = self.conn
+                if deleted_shelves:
+                    conn.executemany("DELETE FROM shelves WHERE id = ?", [(i,) for i in deleted_shelves])
+                if deleted_books:
+                    conn.executemany("DELETE FROM books WHERE id = ?", [(i,) for i in deleted_books])
+                written += len(deleted_shelves) + len(deleted_books)
+
+                assignments = ', '.join(f"{name} = ?" for name in BOOK_COLUMNS)
+                for book, book_id in changed_books:
+                    conn.execute(f"UPDATE books SET {assignments} WHERE id = ?", _book_row(book) + (book_id,))
+                for book, book_id in changed_text:
+                    conn.execute("UPDATE books SET info = ?, summary = ? WHERE id = ?",
+                                 (book.info, book.summary, book_id))
+                    fingerprints[book_id] = hash((book.info, book.summary))
+                inserted = []
+                for book in new_books:
+                    cursor = conn.execute(
+                        f"INSERT INTO books ({', '.join(BOOK_COLUMNS)}, info, summary) "
+                        f"VALUES ({', '.join('?' * (len(BOOK_COLUMNS) + 2))})",
+                        _book_row(book) + (book.info, book.summary)
+                    )
+                    inserted.append((book, cursor.lastrowid))
+                    fingerprints[cursor.lastrowid] = hash((book.info, book.summary))
+                # 新书与字段变化的书重写标签
+                for book, book_id in changed_books + inserted:
+                    conn.execute("DELETE FROM book_tags WHERE book_id = ?", (book_id,))
+                    conn.executemany("INSERT INTO book_tags (book_id, position, tag) VALUES (?, ?, ?)",
+                                     [(book_id, i, tag) for i, tag in enumerate(book.tags)])
+                    books[id(book)] = (book, book_id, hash((_book_row(book), tuple(book.tags))))
+                written += len(changed_books) + len(changed_text) + len(inserted)
+
+                # 书架：位置、名称或书的顺序变化时重写该书架
+                for position in positions:
+                    row = books_2d[position]
+                    book_ids = tuple((books.get(id(book)) or self.books[id(book)])[1] for book in row["books"])
+                    state = (position, row["row_name"], book_ids)
+                    shelf = _shelf_of(row)
+                    entry = self.shelves.get(id(shelf))
+                    if entry is None:
+                        shelf_id = conn.execute("INSERT INTO shelves (position, name) VALUES (?, ?)",
+                                                (position, row["row_name"])).lastrowid
+                    elif entry[2] != state:
+                        shelf_id = entry[1]
+                        conn.execute("UPDATE shelves SET position = ?, name = ? WHERE id = ?",
+                                     (position, row["row_name"], shelf_id))
+                        if entry[2][2] == book_ids:
+                            shelves[id(shelf)] = (shelf, shelf_id, state)
+                            written += 1
+                            continue
+                        conn.execute("DELETE FROM shelf_books WHERE shelf_id = ?", (shelf_id,))
+                    else:
+                        continue
+                    conn.executemany("INSERT INTO shelf_books (shelf_id, position, book_id) VALUES (?, ?, ?)",
+                                     [(shelf_id, i, book_id) for i, book_id in enumerate(book_ids)])
+                    shelves[id(shelf)] = (shelf, shelf_id, state)
+                    written += 1 + len(book_ids)
+
+            for book_id in deleted_books:
+                self.books.pop(self.book_keys.pop(book_id, None), None)
+                self.text_fingerprints.pop(book_id, None)
+            self.books.update(books)
+            self.book_keys.update((entry[1], key) for key, entry in books.items())
+            self.text_fingerprints.update(fingerprints)
+            self.shelves.update(shelves)
+            live_shelves = {id(_shelf_of(row)) for row in books_2d}
+            for key in [key for key in self.shelves if key not in live_shelves]:
+                del self.shelves[key]
+        return written
+
+
+class LogStorage:
+    """bookshelf.json 快照 + 追加式操作日志（见 utlis.BookshelfLog）
+
+    保存时只追加 LibraryStore.take_changes() 得到的操作，日志过长时在后台合并为新快照。
+    """
+
+    def __init__(self, filename="bookshelf.json", compact_threshold=utlis.LOG_COMPACT_THRESHOLD):
+        self.log = utlis.BookshelfLog(filename, compact_threshold=compact_threshold)
+
+    def load(self):
+        return self.log.load()
+
+    def save(self, books_2d, changes=None):
+        """追加操作，返回写入的操作数"""
+        changes = changes or []
+        self.log.append(changes)
+        if self.log.needs_compaction():
+            self.log.compact(books_2d)
+        return len(changes)
+
+    def close(self):
+        self.log.wait()
+
+
+# 默认使用 SQLite；数据库不存在但有旧的 bookshelf.json 时自动导入一次
+# 导入先写入临时数据库，成功后再改名，导入失败时下次启动会重新导入
+# backend="log" 时改用 bookshelf.json 快照 + 操作日志
+def open_storage(db_path="bookshelf.sqlite3", json_path="bookshelf.json", backend="sqlite"):
+    if backend == "log":
+        return LogStorage(json_path)
+    if os.path.exists(db_path) or not os.path.exists(json_path):
+        return SqliteStorage(db_path)
+    tmp_path = db_path + ".importing"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)  # 上次导入失败留下的
+    storage = SqliteStorage(tmp_path)
+    try:
+        import_json(json_path, storage)
+    finally:
+        storage.close()
+    os.replace(tmp_path, db_path)
+    return SqliteStorage(db_path)
+
+
+def import_json(json_path, storage):
+    """把 bookshelf.json 的全部书架写入 SQLite 书库（追加到现有书架之后）"""
+    books_2d = storage.load() + JsonStorage(json_path).load()
+    storage.save(books_2d)
+    return books_2d
+
+
+def export_json(storage, json_path):
+    """把 SQLite 书库导出为 bookshelf.json 格式"""
+    books_2d = storage.load()
+    JsonStorage(json_path).save(books_2d)
+    return books_2d
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 用法: python storage.py import|export [bookshelf.json] [bookshelf.sqlite3]
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export"):
+        sys.exit("用法: python storage.py import|export [bookshelf.json] [bookshelf.sqlite3]")
+    json_path = sys.argv[2] if len(sys.argv) > 2 else "bookshelf.json"
+    db_path = sys.argv[3] if len(sys.argv) > 3 else "bookshelf.sqlite3"
+    storage = SqliteStorage(db_path)
+    if sys.argv[1] == "import":
+        books_2d = import_json(json_path, storage)
+        print(f"已导入 {sum(len(row['books']) for row in books_2d)} 本书到 {db_path}")
+    else:
+        books_2d = export_json(storage, json_path)
+        print(f"已导出 {sum(len(row['books']) for row in books_2d)} 本书到 {json_path}")
@@ -0,0 +1,92 @@
+import threading
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+# 任务信号（在主线程创建，跨线程发射时自动排队到主线程执行）
+class TaskSignals(QObject):
+    progress = pyqtSignal(int, int, str)   # 已完成数, 总数（0 表示未知）, 说明
+    finished = pyqtSignal(object)          # 任务返回值
+    failed = pyqtSignal(str)               # 错误信息
+    cancelled = pyqtSignal()
+
+
+# 后台任务：fn(task) 在线程池中执行，可通过 task 汇报进度、检查是否已取消
+class Task(QRunnable):
+    def __init__(self, description, fn):
+        super().__init__()
+        self.description = description
+        self.fn = fn
+        self.signals = TaskSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report_progress(self, done, total, text=""):
+        self.signals.progress.emit(done, total, text)
+
+    def run(self):
+        try:
+            result = self.fn(self)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+            return
+        if self.is_cancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+# 任务调度器：在后台线程运行网络等耗时操作，结果回调在主线程执行
+class TaskRunner(QObject):
+    task_started = pyqtSignal(str)
+    task_progress = pyqtSignal(int, int, str)
+    task_stopped = pyqtSignal(str)  # 结束说明（完成/失败/取消）
+
+    def __init__(self, parent=None, max_workers=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.tasks = []  # 运行中的任务，保持引用直到结束
+
+    def is_busy(self):
+        return bool(self.tasks)
+
+    def start(self, description, fn, on_finished=None, on_failed=None):
+        task = Task(description, fn)
+        task.setAutoDelete(False)
+
+        def finish(message):
+            if task in self.tasks:
+                self.tasks.remove(task)
+            self.task_stopped.emit(message)
+
+        def handle_finished(result):
+            finish(f"{description}完成")
+            if on_finished:
+                on_finished(result)
+
+        def handle_failed(error):
+            finish(f"{description}失败")
+            if on_failed:
+                on_failed(error)
+
+        task.signals.progress.connect(self.task_progress)
+        task.signals.finished.connect(handle_finished)
+        task.signals.failed.connect(handle_failed)
+        task.signals.cancelled.connect(lambda: finish(f"{description}已取消"))
+
+        self.tasks.append(task)
+        self.task_started.emit(description)
+        self.pool.start(task)
+        return task
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
@@ -0,0 +1,159 @@
+"""AsyncDoubanBookSpider 测试：在本地 aiohttp 服务器上提供保存的豆瓣页面（tests/fixtures）
+
+用法: python -m pytest tests
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from async_douban_spider import AsyncDoubanBookSpider
+from douban_spider import Book, RateLimiter
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class AsyncDoubanBookSpiderTest(AioHTTPTestCase):
+    DETAIL_DELAY = 0.02
+
+    async def get_application(self):
+        self.hits = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        app = web.Application()
+        app.add_routes([
+            web.get("/book/subject_search", self.search),
+            web.get("/html/subject_search", self.search_html),
+            web.get("/flaky/subject_search", self.flaky_search),
+            web.get("/blocked/subject_search", self.blocked_search),
+            web.get("/subject/{sid}/", self.detail),
+            web.get("/malformed/{sid}/", self.malformed_detail),
+        ])
+        return app
+
+    def count(self, request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        return self.hits[request.path]
+
+    async def search(self, request):
+        self.count(request)
+        return web.Response(text=fixture("search_santi.html"), content_type="text/html")
+
+    async def search_html(self, request):
+        return web.Response(text=fixture("search_santi_html.html"), content_type="text/html")
+
+    # 前两次返回 429，之后正常
+    async def flaky_search(self, request):
+        if self.count(request) <= 2:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(text=fixture("search_santi.html"), content_type="text/html")
+
+    async def blocked_search(self, request):
+        self.count(request)
+        return web.Response(status=429, headers={"Retry-After": "0"})
+
+    async def detail(self, request):
+        self.count(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.DETAIL_DELAY)
+            return web.Response(text=fixture("detail_2567698.html"), content_type="text/html")
+        finally:
+            self.in_flight -= 1
+
+    # 评价人数不是数字的详情页
+    async def malformed_detail(self, request):
+        self.count(request)
+        return web.Response(text=fixture("detail_malformed.html"), content_type="text/html")
+
+    def make_spider(self, path="/book/subject_search", **kwargs):
+        kwargs.setdefault("rate_limiter", None)
+        kwargs.setdefault("backoff_factor", 0)
+        spider = AsyncDoubanBookSpider(**kwargs)
+        spider.base_url = str(self.server.make_url(path))
+        return spider
+
+    def local_book(self, sid):
+        return Book("三体", str(self.server.make_url(f"/subject/{sid}/")), 0.0, "", "", "", "")
+
+    async def test_search_books_from_script_data(self):
+        async with self.make_spider() as spider:
+            books = await spider.search_books("三体")
+        self.assertEqual([book.title for book in books], ["三体", "三体Ⅱ", "三体Ⅲ"])
+        first = books[0]
+        self.assertEqual(first.url, "https://book.douban.com/subject/2567698/")
+        self.assertEqual(first.rating, 8.9)
+        self.assertEqual((first.author, first.publisher, first.pub_date, first.price),
+                         ("刘慈欣", "重庆出版社", "2008-1", "23.00"))
+        self.assertEqual(first.source, "script")
+
+    async def test_search_books_html_fallback(self):
+        async with self.make_spider("/html/subject_search") as spider:
+            books = await spider.search_books("三体")
+        self.assertEqual([book.title for book in books], ["三体", "三体Ⅱ"])
+        self.assertEqual(books[1].rating, 9.4)
+        self.assertEqual(books[1].source, "html")
+
+    async def test_get_book_details(self):
+        book = self.local_book(2567698)
+        async with self.make_spider() as spider:
+            result = await spider.get_book_details(book)
+        self.assertIs(result, book)
+        self.assertEqual(book.rating_count, 436502)
+        self.assertEqual(book.tags, ["科幻", "刘慈欣", "三体", "中国"])
+        self.assertTrue(book.summary.startswith("文化大革命如火如荼"))
+        self.assertEqual((book.isbn, book.pages, book.binding, book.series),
+                         ("9787536692930", 302, "平装", "中国科幻基石丛书"))
+        self.assertEqual((book.pub_date_iso, book.price_value), ("2008-01", 23.0))
+        self.assertGreater(book.details_fetched_at, 0)
+
+    async def test_retries_after_429(self):
+        async with self.make_spider("/flaky/subject_search", retries=3) as spider:
+            books = await spider.search_books("三体")
+        self.assertEqual(len(books), 3)
+        self.assertEqual(self.hits["/flaky/subject_search"], 3)
+
+    async def test_gives_up_after_retries(self):
+        async with self.make_spider("/blocked/subject_search", retries=2) as spider:
+            books = await spider.search_books("三体")
+        self.assertEqual(books, [])
+        self.assertEqual(self.hits["/blocked/subject_search"], 3)
+
+    async def test_429_slows_down_rate_limiter(self):
+        limiter = RateLimiter(rate=50, burst=50, min_rate=1, max_rate=100)
+        async with self.make_spider("/flaky/subject_search", rate_limiter=limiter) as spider:
+            await spider.search_books("三体")
+        stats = limiter.stats()[self.server.make_url("/").raw_authority]
+        self.assertEqual(stats["rejected"], 2)
+        self.assertLess(stats["rate"], 50)
+
+    async def test_enrich_many_respects_concurrency(self):
+        books = [self.local_book(2567698 + i) for i in range(12)]
+        async with self.make_spider(concurrency=3) as spider:
+            result = await spider.enrich_many(books)
+        self.assertEqual(result, [(book, None) for book in books])
+        self.assertTrue(all(book.rating_count == 436502 for book in books))
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_enrich_many_records_failures_per_book(self):
+        books = [self.local_book(2567698), self.local_book(2567699)]
+        broken = Book("坏页面", str(self.server.make_url("/malformed/1/")), 0.0, "", "", "", "")
+        books.insert(1, broken)
+        async with self.make_spider() as spider:
+            result = await spider.enrich_many(books)
+        self.assertEqual([book for book, _ in result], books)
+        errors = [error for _, error in result]
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ValueError)
+        self.assertIsNone(errors[2])
+        self.assertEqual(broken.details_fetched_at, 0)
+        self.assertTrue(all(book.rating_count == 436502 for book in (books[0], books[2])))
@@ -0,0 +1,105 @@
+"""SqliteStorage 测试：增量保存、事务失败后的重试
+
+用法: python -m pytest tests
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from douban_spider import Book
+from storage import SqliteStorage, open_storage
+from utlis import books_2d_to_dict, save_bookshelf_to_file
+
+
+def make_book(i):
+    return Book(f"书名{i}", f"https://book.douban.com/subject/{i}/", 8.0, f"作者{i}", "出版社", "", "",
+                info=f"信息{i}", summary=f"简介{i}", tags=[f"标签{i}"])
+
+
+# 代理连接：第一次写入 shelf_books 时抛出异常，模拟事务中途失败
+class FailingConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.failures = 1
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self.conn.__exit__(*exc)
+
+    def executemany(self, sql, params):
+        if "shelf_books" in sql and self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(sql, params)
+
+
+class SqliteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.path = str(Path(tempfile.mkdtemp()) / "bookshelf.sqlite3")
+        self.storage = SqliteStorage(self.path)
+
+    def tearDown(self):
+        self.storage.close()
+
+    def reload(self):
+        storage = SqliteStorage(self.path)
+        try:
+            return books_2d_to_dict(storage.load())
+        finally:
+            storage.close()
+
+    def test_incremental_save(self):
+        books_2d = [{"row_name": "书架", "books": [make_book(i) for i in range(3)]}]
+        self.storage.save(books_2d)
+        books_2d[0]["books"].pop(1)
+        books_2d[0]["books"][0].rating = 9.5
+        books_2d.append({"row_name": "新书架", "books": [make_book(3)]})
+        self.storage.save(books_2d)
+        self.assertEqual(self.reload(), books_2d_to_dict(books_2d))
+        self.assertEqual(self.storage.save(books_2d), 0)
+
+    def test_retry_after_failed_transaction(self):
+        books_2d = [{"row_name": "书架", "books": [make_book(0)]}]
+        self.storage.save(books_2d)
+        books_2d[0]["books"].append(make_book(1))
+        books_2d.append({"row_name": "新书架", "books": [make_book(2)]})
+
+        conn = self.storage.conn
+        self.storage.conn = FailingConnection(conn)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.storage.save(books_2d)
+        self.storage.conn = conn
+
+        self.storage.save(books_2d)
+        self.assertEqual(self.reload(), books_2d_to_dict(books_2d))
+        self.assertEqual(self.storage.save(books_2d), 0)
+
+    def test_failed_import_is_retried(self):
+        directory = Path(tempfile.mkdtemp())
+        db_path, json_path = str(directory / "bookshelf.sqlite3"), str(directory / "bookshelf.json")
+        Path(json_path).write_text("[{", encoding="utf-8")
+        with self.assertRaises(ValueError):
+            open_storage(db_path, json_path)
+        self.assertFalse(os.path.exists(db_path))
+
+        books_2d = [{"row_name": "书架", "books": [make_book(i) for i in range(2)]}]
+        save_bookshelf_to_file(books_2d, json_path)
+        storage = open_storage(db_path, json_path)
+        try:
+            self.assertEqual(books_2d_to_dict(storage.load()), books_2d_to_dict(books_2d))
+        finally:
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
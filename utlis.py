@@ -1,4 +1,13 @@
+import gc
 import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson  # 可选：更快的 JSON 编解码
+except ImportError:
+    orjson = None
 
 from PyQt6.QtWidgets import QLayout
 from PyQt6.QtCore import QSize, QPoint, QRect, Qt
@@ -20,9 +29,26 @@ def book_to_dict(book):
         "url": book.url,
         "cover_url": book.cover_url,
         "source": book.source,
-        "tags": getattr(book, "tags", []),  # 如果没有 tags 则为空列表
+        "tags": list(getattr(book, "tags", [])),  # 复制，编码时不受界面继续修改的影响
+        "details_fetched_at": book.details_fetched_at,
+        "info": book.info,
+        "isbn": book.isbn,
+        "pages": book.pages,
+        "binding": book.binding,
+        "series": book.series,
+        "translator": book.translator,
+        "pub_date_iso": book.pub_date_iso,
+        "price_value": book.price_value,
     }
 
+def snapshot(books_2d):
+    """在主线程中复制书架结构（书对象共用），供后台线程保存；之后对书架的增删移动不影响快照
+
+    快照中的书架通过 "shelf" 指向原书架字典，SqliteStorage 据此对应数据库行。
+    """
+    return [{"row_name": row["row_name"], "books": list(row["books"]), "shelf": row} for row in books_2d]
+
+
 def books_2d_to_dict(books_2d):
     result = []
     for row in books_2d:
@@ -33,7 +59,8 @@ def books_2d_to_dict(books_2d):
         result.append(new_row)
     return result
 
-def book_from_dict(data):
+# text_loader 不为 None 时忽略 data 中的 info/summary，首次访问时再加载（见 Book）
+def book_from_dict(data, text_loader=None):
     return Book(
         title=data.get("title", ""),
         author=data.get("author", ""),
@@ -42,11 +69,21 @@ def book_from_dict(data):
         price=data.get("price", ""),
         rating=data.get("rating", ""),
         rating_count=data.get("rating_count", 0),
-        summary=data.get("summary", ""),
+        summary=data.get("summary", "") if text_loader is None else None,
         url=data.get("url", ""),
         cover_url=data.get("cover_url", ""),
         source=data.get("source", ""),
         tags=data.get("tags", []),
+        details_fetched_at=data.get("details_fetched_at", 0.0),
+        info=data.get("info", "") if text_loader is None else None,
+        isbn=data.get("isbn", ""),
+        pages=data.get("pages", 0),
+        binding=data.get("binding", ""),
+        series=data.get("series", ""),
+        translator=data.get("translator", ""),
+        pub_date_iso=data.get("pub_date_iso", ""),  # 旧文件没有时由 Book 根据 pub_date 计算
+        price_value=data.get("price_value", 0.0),
+        text_loader=text_loader,
     )
 
 
@@ -64,27 +101,233 @@ def clear_layout(layout):
 
 
 
-# 保存至json
+# 批量创建对象时暂停循环垃圾回收：新建的对象都仍被引用，分代回收只会反复扫描它们
+@contextmanager
+def gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def books_from_dicts(items):
+    return [book_from_dict(data) for data in items]
+
+
+# JSON 解析结果 -> books_2d（也接受操作日志的快照格式 {"seq": N, "shelves": [...]}）
+def books_2d_from_data(data):
+    if isinstance(data, dict):
+        data = data["shelves"]
+    return [{"row_name": row["row_name"], "books": books_from_dicts(row["books"])} for row in data]
+
+
+# 编码为 UTF-8 JSON；装有 orjson 时用 orjson，否则用标准库，两者输出的结构相同
+def dumps_json(obj, indent=False):
+    if orjson is not None:
+        return orjson.dumps(obj, default=book_to_dict, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=book_to_dict, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def loads_json(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# 书架 -> JSON；orjson 通过 default=book_to_dict 转换书，不预先构建整棵字典树
+def dumps_bookshelf(bookshelf):
+    if orjson is None:
+        return dumps_json(books_2d_to_dict(bookshelf), indent=True)
+    return dumps_json([{"row_name": row["row_name"], "books": row["books"]} for row in bookshelf], indent=True)
+
+
+# 原子写入：先写临时文件并刷到磁盘，再替换目标文件，中途崩溃不会留下半个文件
+@contextmanager
+def atomic_open(filename, mode="w"):
+    tmp_name = f"{filename}.tmp"
+    with open(tmp_name, mode, encoding=None if "b" in mode else "utf-8") as f:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, filename)
+
+
+def write_file_atomic(filename, data):
+    with atomic_open(filename, "wb") as f:
+        f.write(data if isinstance(data, bytes) else data.encode("utf-8"))
+
+
+# 保存至json（原子替换，写入中途崩溃时原文件保持完整）
 def save_bookshelf_to_file(bookshelf=[], filename="bookshelf.json"):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump([
-            {
-                "row_name": row["row_name"],
-                "books": [book_to_dict(book) for book in row["books"]]
-            } for row in bookshelf
-        ], f, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        write_file_atomic(filename, dumps_bookshelf(bookshelf))
+        return
+    # 标准库：对预先构建的字典边编码边写入，省去 default 回调与拼接整个字符串
+    with atomic_open(filename) as f:
+        json.dump(books_2d_to_dict(bookshelf), f, ensure_ascii=False, indent=2)
 
 
-# 读取json
+# 读取json（也接受操作日志的快照格式 {"seq": N, "shelves": [...]}）
 def load_bookshelf_from_file(filename="bookshelf.json"):
-    with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return [
-        {
-            "row_name": row["row_name"],
-            "books": [book_from_dict(book) for book in row["books"]]
-        } for row in data
-    ]
+    with open(filename, "rb") as f:
+        raw = f.read()
+    with gc_paused():
+        return books_2d_from_data(loads_json(raw))
+
+
+# ---- 追加式操作日志 ----
+
+LOG_COMPACT_THRESHOLD = 1000  # 日志超过多少条操作后合并为快照
+
+
+# LibraryStore.changes 中的操作引用 Book 对象，写入日志前转换为字典
+def encode_op(op):
+    op = dict(op)
+    if "books" in op:
+        op["books"] = [book_to_dict(book) for book in op["books"]]
+    if "book" in op:
+        op["book"] = book_to_dict(op["book"])
+    return op
+
+
+# 在 books_2d 上重放一条操作（与 LibraryStore 的对应方法语义一致）
+def apply_op(books_2d, op):
+    kind = op["op"]
+    if kind == "move":
+        (from_row, from_col), (to_row, to_col) = op["from"], op["to"]
+        book = books_2d[from_row]["books"].pop(from_col)
+        if from_row == to_row and from_col < to_col:
+            to_col -= 1
+        to_col = max(0, min(to_col, len(books_2d[to_row]["books"])))
+        books_2d[to_row]["books"].insert(to_col, book)
+    elif kind == "remove":
+        books_2d[op["row"]]["books"].pop(op["col"])
+    elif kind == "insert":
+        books_2d[op["row"]]["books"][op["col"]:op["col"]] = [book_from_dict(data) for data in op["books"]]
+    elif kind == "update":
+        books_2d[op["row"]]["books"][op["col"]] = book_from_dict(op["book"])
+    elif kind == "sort":
+        books = books_2d[op["row"]]["books"]
+        books[:] = [books[i] for i in op["order"]]
+    elif kind == "add_shelf":
+        books_2d.append({"row_name": op["name"], "books": [book_from_dict(data) for data in op.get("books", ())]})
+    elif kind == "rename_shelf":
+        books_2d[op["row"]]["row_name"] = op["name"]
+    elif kind == "merge_shelf":
+        books_2d[op["target"]]["books"].extend(books_2d[op["row"]]["books"])
+        del books_2d[op["row"]]
+    elif kind == "delete_shelf":
+        del books_2d[op["row"]]
+    else:
+        raise ValueError(f"未知操作: {kind}")
+
+
+class BookshelfLog:
+    """快照 + 追加式操作日志
+
+    保存时只把新操作追加到日志（每批 fsync 一次），耗时与改动量成正比；
+    日志超过阈值后在后台线程把当前书架写成快照 {"seq": N, "shelves": [...]}，再删掉日志中 seq <= N 的操作。
+    加载时读快照（兼容旧的列表格式）并重放其后的操作；末尾写了一半的行会被丢弃。
+    """
+
+    def __init__(self, filename="bookshelf.json", log_filename=None, compact_threshold=LOG_COMPACT_THRESHOLD):
+        self.filename = filename
+        self.log_filename = log_filename or f"{filename}.log"
+        self.compact_threshold = compact_threshold
+        self.seq = 0            # 最后一条操作的序号
+        self.pending = 0        # 快照之后的操作数
+        self.lock = threading.Lock()  # 保护日志文件，后台合并时追加操作需等待
+        self.compactor = None
+
+    def load(self):
+        try:
+            with open(self.filename, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b"[]"
+        with gc_paused():
+            data = loads_json(raw)
+            books_2d = books_2d_from_data(data)
+        snapshot_seq = data.get("seq", 0) if isinstance(data, dict) else 0
+        self.seq = snapshot_seq
+        self.pending = 0
+
+        try:
+            f = open(self.log_filename, "rb")
+        except FileNotFoundError:
+            return books_2d
+        with f:
+            valid_end = 0
+            for line in f:
+                # 崩溃时可能留下不完整的最后一行，丢弃它及之后的内容
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    op = loads_json(line)
+                except ValueError:
+                    break
+                valid_end += len(line)
+                if op["seq"] <= snapshot_seq:
+                    continue  # 已包含在快照中（合并时在替换日志前崩溃）
+                apply_op(books_2d, op)
+                self.seq = op["seq"]
+                self.pending += 1
+            torn = f.seek(0, os.SEEK_END) > valid_end
+        if torn:
+            with open(self.log_filename, "r+b") as f:
+                f.truncate(valid_end)
+        return books_2d
+
+    def append(self, ops):
+        """追加一批操作（LibraryStore.take_changes() 的结果）并刷到磁盘"""
+        if not ops:
+            return
+        lines = []
+        for op in ops:
+            self.seq += 1
+            lines.append(dumps_json(dict(encode_op(op), seq=self.seq)) + b"\n")
+        with self.lock:
+            with open(self.log_filename, "ab") as f:
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+        self.pending += len(ops)
+
+    def needs_compaction(self):
+        return self.pending >= self.compact_threshold and not self.is_compacting()
+
+    def is_compacting(self):
+        return self.compactor is not None and self.compactor.is_alive()
+
+    def compact(self, books_2d, background=True):
+        """把当前书架写成快照；调用线程只复制书架结构，转换与写文件在后台线程"""
+        rows = snapshot(books_2d)
+        seq = self.seq
+        self.pending = 0
+        if background:
+            self.compactor = threading.Thread(target=self._write_snapshot, args=(rows, seq))
+            self.compactor.start()
+        else:
+            self._write_snapshot(rows, seq)
+
+    def _write_snapshot(self, rows, seq):
+        data = {"seq": seq, "shelves": books_2d_to_dict(rows)}
+        write_file_atomic(self.filename, dumps_json(data))
+        # 快照之后追加的操作保留在日志中
+        with self.lock:
+            try:
+                with open(self.log_filename, "rb") as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                return
+            keep = [line for line in lines if line.endswith(b"\n") and loads_json(line)["seq"] > data["seq"]]
+            write_file_atomic(self.log_filename, b"".join(keep))
+
+    def wait(self):
+        """等待后台合并完成"""
+        if self.compactor is not None:
+            self.compactor.join()
 
 
 
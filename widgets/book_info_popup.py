@@ -42,7 +42,11 @@ class BookInfoPopup(QWidget):
             f"出版社: {self.book.publisher}<br>"
             f"出版日期: {self.book.pub_date}<br>"
             f"价格: {self.book.price}<br>"
-            f"评分: {self.book.rating} ({self.book.rating_count}人评价)<br>"
+            + (f"译者: {self.book.translator}<br>" if self.book.translator else "")
+            + (f"丛书: {self.book.series}<br>" if self.book.series else "")
+            + (f"页数: {self.book.pages}　装帧: {self.book.binding}<br>" if self.book.pages else "")
+            + (f"ISBN: {self.book.isbn}<br>" if self.book.isbn else "")
+            + f"评分: {self.book.rating} ({self.book.rating_count}人评价)<br>"
             f"简介: {self.book.summary}"
         )
         text_label = QLabel(info_text)
@@ -0,0 +1,228 @@
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtGui import QFont, QColor, QPalette
+from PyQt6.QtCore import Qt, QSize, QRect, QPoint, QMimeData, QModelIndex, QAbstractListModel, QTimer
+
+from widgets.book_info_popup import BookInfoPopup
+from widgets.book_widget import exec_book_context_menu
+from widgets.cover_loader import get_cover_loader, COVER_WIDTH
+
+
+BOOK_ROLE = Qt.ItemDataRole.UserRole
+
+
+# 单个书架的列表模型，直接读写 books_2d 中该行的书籍列表
+class BookListModel(QAbstractListModel):
+    def __init__(self, row_index, books, main_window, parent=None):
+        super().__init__(parent)
+        self.row_index = row_index
+        self.books = books
+        self.main_window = main_window
+        self.rows_by_cover = None  # cover_url -> [行号]，按需建立
+        get_cover_loader().cover_ready.connect(self.on_cover_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.books)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self.books)):
+            return None
+        book = self.books[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return book.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{book.title}\n{book.author}"
+        if role == BOOK_ROLE:
+            return book
+        return None
+
+    # 书架数据变化后整体重置（视图只重绘可见项，代价很小）
+    def set_books(self, books):
+        self.beginResetModel()
+        self.books = books
+        self.rows_by_cover = None
+        self.endResetModel()
+
+    # 封面加载完成后只重绘使用该封面的书
+    def on_cover_ready(self, url, width):
+        if self.rows_by_cover is None:
+            self.rows_by_cover = {}
+            for row, book in enumerate(self.books):
+                self.rows_by_cover.setdefault(book.cover_url, []).append(row)
+        for row in self.rows_by_cover.get(url, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    # 拖放：沿用 BookWidget 的 "行,列" 文本格式
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def supportedDragActions(self):
+        return Qt.DropAction.MoveAction
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return ["text/plain"]
+
+    def mimeData(self, indexes):
+        mime_data = QMimeData()
+        if indexes:
+            mime_data.setText(f"{self.row_index},{indexes[0].row()}")
+        return mime_data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        try:
+            from_row, from_col = map(int, data.text().split(","))
+        except ValueError:
+            return False
+        if parent.isValid():
+            # 落在某本书上，插到它前面
+            row = parent.row()
+        if row < 0:
+            row = len(self.books)
+        to_pos = (self.row_index, row)
+        # 拖动结束后再修改数据，避免在拖放过程中重置模型
+        QTimer.singleShot(0, lambda: self.main_window.insert_book((from_row, from_col), to_pos))
+        # 返回 False，视图不会再自行删除源项
+        return False
+
+
+# 书籍绘制委托：直接绘制封面、书名和作者，不再为每本书创建控件
+# 尺寸与 BookRowWidget 一致：书宽 120、间距 15、左边距 10，封面与书名、作者之间各隔 10px
+class BookDelegate(QStyledItemDelegate):
+    ITEM_WIDTH = 120
+    ITEM_HEIGHT = 200
+    COVER_HEIGHT = 150
+    MARGIN = 10
+    COLUMN_SPACING = 15
+    SPACING = 10
+
+    def sizeHint(self, option, index):
+        return QSize(self.ITEM_WIDTH + self.COLUMN_SPACING, self.ITEM_HEIGHT)
+
+    def paint(self, painter, option, index):
+        book = index.data(BOOK_ROLE)
+        if book is None:
+            return
+        rect = QRect(option.rect.x() + self.MARGIN, option.rect.y(), self.ITEM_WIDTH, option.rect.height())
+        painter.save()
+        painter.setClipRect(rect)
+
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(rect, option.palette.highlight().color().lighter(170))
+
+        # 1. 书封面
+        loader = get_cover_loader()
+        pixmap = loader.fetch(book.cover_url) if book.cover_url else None
+        if pixmap is not None:
+            cover_height = min(pixmap.height(), self.COVER_HEIGHT)
+            x = rect.x() + (rect.width() - pixmap.width()) // 2
+            painter.drawPixmap(x, rect.y(), pixmap, 0, 0, pixmap.width(), cover_height)
+        else:
+            if not book.cover_url:
+                text = "无封面"
+            elif (book.cover_url, COVER_WIDTH) in loader.failed:
+                text = "封面加载失败"
+            else:
+                text = "加载中…"
+            cover_height = painter.fontMetrics().height()
+            painter.drawText(QRect(rect.x(), rect.y(), rect.width(), cover_height), Qt.AlignmentFlag.AlignCenter, text)
+
+        # 2. 书名
+        y = rect.y() + cover_height + self.SPACING
+        title_font = QFont(option.font)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        title_flags = Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap
+        title_rect = painter.fontMetrics().boundingRect(QRect(rect.x(), y, rect.width(), rect.height()), title_flags, book.title)
+        painter.drawText(QRect(rect.x(), y, rect.width(), title_rect.height()), title_flags, book.title)
+
+        # 3. 作者
+        y += title_rect.height() + self.SPACING
+        author_font = QFont(option.font)
+        author_font.setPixelSize(10)
+        painter.setFont(author_font)
+        painter.setPen(QColor("gray"))
+        author = painter.fontMetrics().elidedText(book.author, Qt.TextElideMode.ElideRight, rect.width())
+        painter.drawText(QRect(rect.x(), y, rect.width(), painter.fontMetrics().height()), Qt.AlignmentFlag.AlignHCenter, author)
+
+        painter.restore()
+
+
+# 模型/视图模式的行书架类，接口与 BookRowWidget 保持一致
+class BookListView(QListView):
+    def __init__(self, row_index, books, main_window):
+        super().__init__()
+        self.main_window = main_window
+        self.book_model = BookListModel(row_index, books, main_window, self)
+        self.setModel(self.book_model)
+        self.setItemDelegate(BookDelegate(self))
+
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        self.setUniformItemSizes(True)
+        self.setSpacing(0)
+        palette = self.palette()
+        palette.setColor(QPalette.ColorRole.Base, palette.color(QPalette.ColorRole.Window))
+        self.setPalette(palette)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
+        self.setDefaultDropAction(Qt.DropAction.MoveAction)
+        self.setDropIndicatorShown(True)
+        self.setAcceptDrops(True)
+        self.setDragEnabled(True)
+
+    @property
+    def row_index(self):
+        return self.book_model.row_index
+
+    @row_index.setter
+    def row_index(self, value):
+        self.book_model.row_index = value
+
+    @property
+    def books(self):
+        return self.book_model.books
+
+    # 视图不持有书籍控件，不参与 refresh_view 的跨行复用
+    def book_widget_map(self):
+        return {}
+
+    def refresh_row(self, books=None, pool=None):
+        self.book_model.set_books(self.books if books is None else books)
+
+    # 非编辑模式下点击弹出详情卡
+    def mousePressEvent(self, event):
+        index = self.indexAt(event.pos())
+        if (event.button() == Qt.MouseButton.LeftButton and index.isValid()
+                and not self.main_window.edit_mode):
+            global_pos = self.viewport().mapToGlobal(event.pos())
+            popup = BookInfoPopup(index.data(BOOK_ROLE))
+            popup.adjustSize()
+            popup.move(popup.adjust_position(global_pos) - QPoint(5, 5))  # 自动修正位置
+            popup.show()
+            self.info_popup = popup
+            return
+        super().mousePressEvent(event)
+
+    # 仅编辑模式允许拖动
+    def startDrag(self, supported_actions):
+        if self.main_window.edit_mode:
+            super().startDrag(supported_actions)
+
+    # 右键挂载菜单
+    def contextMenuEvent(self, event):
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            return
+        exec_book_context_menu(self, index.data(BOOK_ROLE), self.row_index, index.row(),
+                               self.main_window, event.globalPos())
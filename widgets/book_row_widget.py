@@ -33,22 +33,63 @@ class BookRowWidget(QWidget):
         self.refresh_row()
         
 
-    # 刷新一行
-    def refresh_row(self, books=None):
+    # 当前行中的书籍控件，键为 id(book)
+    def book_widget_map(self):
+        widgets = {}
+        for i in range(self.h_layout.count()):
+            widget = self.h_layout.itemAt(i).widget()
+            if isinstance(widget, BookWidget):
+                widgets[id(widget.book)] = widget
+        return widgets
+
+    # 刷新一行：按书籍身份复用控件，只创建、移动、删除有变化的部分
+    # pool 为多行共享的待复用控件表，未被认领的控件由调用方删除
+    def refresh_row(self, books=None, pool=None):
         if books is None:
             books = self.books
+        self.books = books
 
-        while self.h_layout.count():
-            item = self.h_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        own_pool = pool is None
+        if own_pool:
+            pool = {}
+        pool.update(self.book_widget_map())
 
-        for col, book in enumerate(books):
-            book_widget = BookWidget(book, self.row_index, col, self.main_window, self)
-            self.h_layout.addWidget(book_widget)
+        # 拖动残留的占位符不再需要
+        self.remove_placeholder()
+        self.dragged_widget = None
 
-        self.h_layout.addStretch()
+        widgets = []
+        for col, book in enumerate(books):
+            book_widget = pool.pop(id(book), None)
+            if book_widget is None:
+                book_widget = BookWidget(book, self.row_index, col, self.main_window, self)
+            else:
+                book_widget.set_position(self.row_index, col)
+            widgets.append(book_widget)
+
+        # 移出不再属于本行的控件
+        keep = set(map(id, widgets))
+        for i in reversed(range(self.h_layout.count())):
+            widget = self.h_layout.itemAt(i).widget()
+            if widget is not None and id(widget) not in keep:
+                self.h_layout.removeWidget(widget)
+
+        for col, book_widget in enumerate(widgets):
+            if self.h_layout.indexOf(book_widget) != col:
+                old_row = book_widget.parentWidget()
+                if old_row is not self and isinstance(old_row, BookRowWidget):
+                    old_row.h_layout.removeWidget(book_widget)
+                self.h_layout.removeWidget(book_widget)
+                self.h_layout.insertWidget(col, book_widget)
+            if book_widget.isHidden():
+                book_widget.show()
+
+        if self.h_layout.count() == len(widgets):
+            self.h_layout.addStretch()
+
+        if own_pool:
+            for book_widget in pool.values():
+                book_widget.deleteLater()
 
 
     # 放置占位符
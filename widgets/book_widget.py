@@ -2,16 +2,14 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from mainwindow import MainWindow
 
-import hashlib
-from pathlib import Path
-import requests
 from PyQt6 import sip
 
 from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QMenu, QMessageBox, QDialog
-from PyQt6.QtGui import QPixmap, QDrag, QMouseEvent, QContextMenuEvent, QGuiApplication, QAction
+from PyQt6.QtGui import QDrag, QMouseEvent, QContextMenuEvent, QGuiApplication, QAction
 from PyQt6.QtCore import Qt, QMimeData, QPoint, QTimer
 
 from widgets.book_info_popup import BookInfoPopup
+from widgets.cover_loader import get_cover_loader
 from widgets.tag_editor import TagEditorDialog
 
 
@@ -59,6 +57,19 @@ class BookWidget(QWidget):
         self.author_label.setStyleSheet("color: gray; font-size: 10px;")
         layout.addWidget(self.author_label)
 
+    # 刷新复用时更新所在位置
+    def set_position(self, row, col):
+        self.row = row
+        self.col = col
+
+    # 虚拟化行回收复用时绑定另一本书
+    def set_book(self, book, row, col):
+        self.book = book
+        self.set_position(row, col)
+        self.title_label.setText(book.title)
+        self.author_label.setText(book.author)
+        self.load_cover(book.cover_url)
+
     # 双击事件(暂无事件)
     def mouseDoubleClickEvent(self, event):
         event.accept()
@@ -98,61 +109,45 @@ class BookWidget(QWidget):
                     parent.handle_drag_finished(drop_action)
 
     def load_cover(self, url):
+        self.cover_label.setProperty("cover_url", url)
         if url:
-            try:
-                cache_dir = Path("cache")
-                cache_dir.mkdir(exist_ok=True)
-
-                # 用 url 的哈希值作为文件名
-                filename = hashlib.md5(url.encode("utf-8")).hexdigest() + ".jpg"
-                filepath = cache_dir / filename
-
-                if filepath.exists():
-                    # 如果缓存存在，直接加载本地文件
-                    pixmap = QPixmap(str(filepath))
-                else:
-                    # 下载图片并缓存
-                    headers = {
-                        "User-Agent": "Mozilla/5.0"
-                    }
-                    response = requests.get(url, headers=headers, timeout=10)
-                    response.raise_for_status()
-                    filepath.write_bytes(response.content)
-                    pixmap = QPixmap(str(filepath))
-                pixmap = pixmap.scaledToWidth(100, Qt.TransformationMode.SmoothTransformation)
-                self.cover_label.setPixmap(pixmap)
-            except Exception as e:
-                print("加载封面失败:", e)
-                self.cover_label.setText("封面加载失败")
+            # 后台下载，完成后通过信号填入 cover_label
+            get_cover_loader().request(url, self.cover_label)
         else:
             self.cover_label.setText("无封面")
 
     # 右键挂载菜单
     def contextMenuEvent(self, event):
-        menu = QMenu(self)
-        delete_action = menu.addAction("删除")
+        exec_book_context_menu(self, self.book, self.row, self.col, self.main_window, event.globalPos())
 
-        menu.addSeparator()
 
-        action_edit_tag = QAction("编辑标签", self)
+# 书籍右键菜单（BookWidget 与模型/视图模式共用）
+def exec_book_context_menu(parent, book, row, col, main_window, global_pos):
+    menu = QMenu(parent)
+    delete_action = menu.addAction("删除")
 
-        def open_tag_editor():
-            dialog = TagEditorDialog(self.book, self)
-            if dialog.exec():
-                print(f"已更新《{self.book.title}》的标签为: {self.book.tags}")
-                self.main_window.refresh_view()
+    menu.addSeparator()
 
-        action_edit_tag.triggered.connect(open_tag_editor)
-        menu.addAction(action_edit_tag)
+    action_edit_tag = QAction("编辑标签", parent)
 
-        action = menu.exec(event.globalPos())
-        
-        if action == delete_action:
-            reply = QMessageBox.question(
-                self,
-                "确认删除",
-                f"确定要删除《{self.book.title}》吗？",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.Yes:
-                self.main_window.remove_book(self.row, self.col)
+    def open_tag_editor():
+        dialog = TagEditorDialog(book, parent)
+        if dialog.exec():
+            print(f"已更新《{book.title}》的标签为: {book.tags}")
+            main_window.library.touch(book)
+            main_window.refresh_view()
+
+    action_edit_tag.triggered.connect(open_tag_editor)
+    menu.addAction(action_edit_tag)
+
+    action = menu.exec(global_pos)
+
+    if action == delete_action:
+        reply = QMessageBox.question(
+            parent,
+            "确认删除",
+            f"确定要删除《{book.title}》吗？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            main_window.remove_book(row, col)
@@ -0,0 +1,262 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import requests
+from PyQt6 import sip
+
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+COVER_WIDTH = 100          # 封面显示宽度
+MAX_COVER_WORKERS = 6      # 同时下载封面的最大线程数
+PIXMAP_CACHE_BYTES = 64 * 1024 * 1024  # 内存封面缓存上限（字节）
+ORIGINALS_MAX_BYTES = 200 * 1024 * 1024  # 磁盘原图缓存上限（字节）
+
+
+# 磁盘封面缓存：cache/thumbs 存缩略图，cache/ 下按需保留原图
+class CoverDiskCache:
+    def __init__(self, cache_dir="cache", keep_originals=False, originals_max_bytes=ORIGINALS_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.thumb_dir = self.cache_dir / "thumbs"
+        self.keep_originals = keep_originals
+        self.originals_max_bytes = originals_max_bytes
+        self.lock = threading.Lock()
+        self.originals_bytes = None  # 首次写入原图时统计
+
+    @staticmethod
+    def url_hash(url):
+        return hashlib.md5(url.encode("utf-8")).hexdigest()
+
+    def thumb_path(self, url, width):
+        return self.thumb_dir / f"{self.url_hash(url)}_w{width}.jpg"
+
+    # 原图沿用旧版缓存的文件名，旧缓存可直接生成缩略图
+    def original_path(self, url):
+        return self.cache_dir / (self.url_hash(url) + ".jpg")
+
+    # 先写临时文件再改名，避免中断后留下半张图片
+    @staticmethod
+    def write_atomic(path, data):
+        tmp_path = path.with_suffix(".part")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def save_thumb(self, url, width, image):
+        self.thumb_dir.mkdir(parents=True, exist_ok=True)
+        path = self.thumb_path(url, width)
+        tmp_path = path.with_suffix(".part")
+        if image.save(str(tmp_path), "JPG", 90):
+            tmp_path.replace(path)
+
+    def save_original(self, url, data):
+        path = self.original_path(url)
+        self.write_atomic(path, data)
+        with self.lock:
+            if self.originals_bytes is None:
+                self.originals_bytes = sum(f.stat().st_size for f in self.cache_dir.glob("*.jpg"))
+            else:
+                self.originals_bytes += len(data)
+            if self.originals_bytes > self.originals_max_bytes:
+                self.evict_originals()
+
+    # 按访问时间淘汰最旧的原图，直到低于预算
+    def evict_originals(self):
+        files = []
+        for f in self.cache_dir.glob("*.jpg"):
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, f))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if total <= self.originals_max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+        self.originals_bytes = total
+
+    # 读取原图并刷新访问时间
+    def load_original(self, url):
+        path = self.original_path(url)
+        if not path.exists():
+            return None
+        image = QImage(str(path))
+        if image.isNull():
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+
+# 已缩放封面的内存 LRU 缓存，键为 (url, 宽度)
+class PixmapCache:
+    def __init__(self, max_bytes=PIXMAP_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.items = OrderedDict()  # key -> (pixmap, 字节数)
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key):
+        entry = self.items.get(key)
+        if entry is None:
+            return None
+        self.items.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, pixmap):
+        size = self.pixmap_bytes(pixmap)
+        if size > self.max_bytes:
+            return
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self.items[key] = (pixmap, size)
+        self.total_bytes += size
+        # 超出预算时淘汰最久未使用的封面
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.items.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def clear(self):
+        self.items.clear()
+        self.total_bytes = 0
+
+
+# 后台下载任务（只处理 QImage，QPixmap 必须在主线程创建）
+class _CoverTask(QRunnable):
+    def __init__(self, loader, url, width):
+        super().__init__()
+        self.loader = loader
+        self.url = url
+        self.width = width
+        self.disk_cache = loader.disk_cache
+        self.headers = loader.headers
+        self.http = loader.session or requests
+
+    def run(self):
+        image = QImage()
+        try:
+            image = self.load_image()
+        except Exception as e:
+            print("加载封面失败:", e)
+            image = QImage()
+
+        # 跨线程发射信号，槽函数在主线程执行（程序退出时加载器可能已销毁）
+        if not sip.isdeleted(self.loader):
+            self.loader.image_loaded.emit(self.url, self.width, image)
+
+    def load_image(self):
+        cache = self.disk_cache
+
+        # 1. 缩略图已存在，直接读取小文件
+        thumb_path = cache.thumb_path(self.url, self.width)
+        if thumb_path.exists():
+            image = QImage(str(thumb_path))
+            if not image.isNull():
+                return image
+
+        # 2. 有原图（含旧版缓存）则从原图生成缩略图，否则下载
+        image = cache.load_original(self.url)
+        if image is None:
+            response = self.http.get(self.url, headers=self.headers, timeout=10)
+            response.raise_for_status()
+            image = QImage()
+            if not image.loadFromData(response.content):
+                raise ValueError(f"无法解码图片 {self.url}")
+            if cache.keep_originals:
+                cache.cache_dir.mkdir(exist_ok=True)
+                cache.save_original(self.url, response.content)
+
+        image = image.scaledToWidth(self.width, Qt.TransformationMode.SmoothTransformation)
+        cache.save_thumb(self.url, self.width, image)
+        return image
+
+
+# 封面异步加载器（全局共享一个实例）
+class CoverLoader(QObject):
+    image_loaded = pyqtSignal(str, int, QImage)
+    cover_ready = pyqtSignal(str, int)  # 封面已进入内存缓存（或加载失败）
+
+    def __init__(self, cache_dir="cache", max_workers=MAX_COVER_WORKERS, cache_bytes=PIXMAP_CACHE_BYTES,
+                 keep_originals=False, originals_max_bytes=ORIGINALS_MAX_BYTES):
+        super().__init__()
+        self.disk_cache = CoverDiskCache(cache_dir, keep_originals, originals_max_bytes)
+        self.headers = {
+            "User-Agent": "Mozilla/5.0"
+        }
+        self.session = None  # 可设为 DoubanBookSpider.session 以共享连接池
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.pixmaps = PixmapCache(cache_bytes)
+        self.pending = {}  # (url, 宽度) -> [等待该封面的 QLabel]
+        self.failed = set()  # fetch() 加载失败过的 (url, 宽度)，不再自动重试
+        self.image_loaded.connect(self.on_image_loaded)
+
+    # 请求把 url 对应的封面填入 label，立即返回
+    def request(self, url, label, width=COVER_WIDTH):
+        key = (url, width)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            # 命中内存缓存，无需读盘和解码
+            label.setPixmap(pixmap)
+            return
+
+        label.setText("加载中…")
+        waiting = self.pending.get(key)
+        if waiting is not None:
+            # 同一封面已在下载，不重复提交
+            waiting.append(label)
+            return
+        self.pending[key] = [label]
+        self.pool.start(_CoverTask(self, url, width))
+
+    # 不绑定控件的请求：命中缓存返回 QPixmap，否则后台加载并返回 None，
+    # 加载完成后发出 cover_ready（供模型/委托重绘使用）
+    def fetch(self, url, width=COVER_WIDTH):
+        key = (url, width)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None or key in self.failed:
+            return pixmap
+        if key not in self.pending:
+            self.pending[key] = []
+            self.pool.start(_CoverTask(self, url, width))
+        return None
+
+    # 下载完成（主线程）
+    def on_image_loaded(self, url, width, image):
+        labels = self.pending.pop((url, width), [])
+        pixmap = None
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
+            self.pixmaps.put((url, width), pixmap)
+        else:
+            self.failed.add((url, width))
+        self.cover_ready.emit(url, width)
+        for label in labels:
+            # 书籍控件可能已被 refresh_view 销毁
+            if sip.isdeleted(label) or label.property("cover_url") != url:
+                continue
+            if pixmap is None:
+                label.setText("封面加载失败")
+            else:
+                label.setPixmap(pixmap)
+
+
+_cover_loader = None
+
+
+def get_cover_loader():
+    global _cover_loader
+    if _cover_loader is None:
+        _cover_loader = CoverLoader()
+    return _cover_loader
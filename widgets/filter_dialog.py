@@ -0,0 +1,82 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox, QDoubleSpinBox,
+                             QSpinBox, QPushButton, QListWidget, QLabel)
+
+from douban_spider import collation_key
+
+
+# 书库筛选对话框：条件交给 LibraryStore.filter 在列式存储上计算
+class FilterDialog(QDialog):
+    def __init__(self, library, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.setWindowTitle("筛选书库")
+        self.resize(480, 520)
+
+        main_layout = QVBoxLayout(self)
+        form = QFormLayout()
+
+        self.rating_input = QDoubleSpinBox()
+        self.rating_input.setRange(0, 10)
+        self.rating_input.setSingleStep(0.5)
+        self.rating_input.setSpecialValueText("不限")
+        form.addRow("最低评分：", self.rating_input)
+
+        self.author_input = self.make_choice(library.authors.values)
+        form.addRow("作者：", self.author_input)
+        self.publisher_input = self.make_choice(library.publishers.values)
+        form.addRow("出版社：", self.publisher_input)
+        self.tag_input = self.make_choice(library.tags.values)
+        form.addRow("标签：", self.tag_input)
+
+        year_layout = QHBoxLayout()
+        self.year_from_input = self.make_year()
+        self.year_to_input = self.make_year()
+        year_layout.addWidget(self.year_from_input)
+        year_layout.addWidget(QLabel("至"))
+        year_layout.addWidget(self.year_to_input)
+        form.addRow("出版年份：", year_layout)
+        main_layout.addLayout(form)
+
+        filter_button = QPushButton("筛选")
+        filter_button.clicked.connect(self.apply_filter)
+        main_layout.addWidget(filter_button)
+
+        self.count_label = QLabel()
+        main_layout.addWidget(self.count_label)
+        self.result_list = QListWidget()
+        main_layout.addWidget(self.result_list)
+
+        self.apply_filter()
+
+    # 可输入的下拉框，选项为书库中出现过的值，留空表示不限
+    @staticmethod
+    def make_choice(values):
+        combo = QComboBox()
+        combo.setEditable(True)
+        combo.addItem("")
+        combo.addItems(sorted((value for value in values if value), key=collation_key))
+        return combo
+
+    @staticmethod
+    def make_year():
+        spin = QSpinBox()
+        spin.setRange(0, 2100)
+        spin.setSpecialValueText("不限")
+        return spin
+
+    def apply_filter(self):
+        books = self.library.filter(
+            min_rating=self.rating_input.value() or None,
+            author=self.author_input.currentText().strip() or None,
+            publisher=self.publisher_input.currentText().strip() or None,
+            tag=self.tag_input.currentText().strip() or None,
+            year_from=self.year_from_input.value() or None,
+            year_to=self.year_to_input.value() or None,
+        )
+        shelf_names = {id(book): row["row_name"] for row in self.library.shelves for book in row["books"]}
+        self.result_list.clear()
+        for book in books:
+            self.result_list.addItem(
+                f"《{book.title}》 {book.author}  评分 {book.rating or '无'}  —  {shelf_names.get(id(book), '')}"
+            )
+        self.count_label.setText(f"共 {len(books)} 本")
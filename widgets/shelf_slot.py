@@ -0,0 +1,27 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+
+
+# 书架占位类：固定高度，滚动到可见区域附近时才放入真正的行书架控件
+class ShelfSlot(QWidget):
+    def __init__(self, row_data, row_index, height):
+        super().__init__()
+        self.row_data = row_data  # 持有书架字典，保证 id 在占位存活期间不会被复用
+        self.row_index = row_index
+        self.row_widget = None
+        self.setFixedHeight(height)
+
+        self.v_layout = QVBoxLayout(self)
+        self.v_layout.setContentsMargins(0, 0, 0, 0)
+
+    # 放入真正的行书架控件
+    def set_row_widget(self, row_widget):
+        self.row_widget = row_widget
+        self.v_layout.addWidget(row_widget)
+
+    # 释放行书架控件，恢复为空占位
+    def release(self):
+        if self.row_widget is not None:
+            self.v_layout.removeWidget(self.row_widget)
+            self.row_widget.deleteLater()
+            self.row_widget = None
@@ -0,0 +1,157 @@
+from PyQt6.QtCore import Qt, QEvent
+
+from widgets.book_row_widget import BookRowWidget
+from widgets.book_widget import BookWidget
+
+
+
+# 虚拟化行书架类：只为可见范围（加少量预留）创建书籍控件，滚动时回收复用
+class VirtualBookRowWidget(BookRowWidget):
+    BOOK_WIDTH = 120   # 与 BookWidget.setFixedWidth 保持一致
+    SPACING = 15       # 与 BookRowWidget 的布局间距一致
+    MARGIN = 10
+    OVERSCAN = 3       # 可见范围两侧额外保留的书本数
+
+    def __init__(self, row_index, books, main_window):
+        self.active_widgets = {}   # col -> BookWidget
+        self.free_widgets = []     # 已回收、待复用的 BookWidget
+        self.viewport = None
+        super().__init__(row_index, books, main_window)
+
+    @property
+    def slot_width(self):
+        return self.BOOK_WIDTH + self.SPACING
+
+    # 虚拟行自行管理控件，不参与 refresh_view 的跨行复用
+    def book_widget_map(self):
+        return {}
+
+    # 刷新一行：只更新总宽度并重新绑定可见范围内的控件
+    def refresh_row(self, books=None, pool=None):
+        if books is None:
+            books = self.books
+        self.books = books
+
+        self.remove_placeholder()
+        if self.dragged_widget is not None:
+            self.dragged_widget.show()
+            self.dragged_widget = None
+
+        total = 2 * self.MARGIN + len(books) * self.slot_width - (self.SPACING if books else 0)
+        self.setMinimumWidth(total)
+        self.update_visible()
+
+    # 当前可见的列范围 [first, last)
+    def visible_range(self):
+        if self.viewport is None:
+            # 尚未放入滚动区，暂不创建任何控件
+            return 0, 0
+        left = -self.x()
+        right = left + self.viewport.width()
+        first = max(0, (left - self.MARGIN) // self.slot_width - self.OVERSCAN)
+        last = min(len(self.books), (right - self.MARGIN) // self.slot_width + 1 + self.OVERSCAN)
+        return first, max(first, last)
+
+    # 创建/回收控件，使可见范围内每一列都有控件
+    def update_visible(self):
+        first, last = self.visible_range()
+
+        # 仍在范围内且书籍未变的控件直接保留，其余的回收
+        by_book = {}
+        for col, widget in self.active_widgets.items():
+            by_book.setdefault(id(widget.book), []).append(widget)
+
+        new_active = {}
+        missing = []
+        for col in range(first, last):
+            candidates = by_book.get(id(self.books[col]))
+            if candidates:
+                widget = candidates.pop()
+                widget.set_position(self.row_index, col)
+                new_active[col] = widget
+            else:
+                missing.append(col)
+
+        for widgets in by_book.values():
+            for widget in widgets:
+                widget.hide()
+                self.free_widgets.append(widget)
+
+        for col in missing:
+            book = self.books[col]
+            if self.free_widgets:
+                widget = self.free_widgets.pop()
+                widget.set_book(book, self.row_index, col)
+            else:
+                widget = BookWidget(book, self.row_index, col, self.main_window, self)
+            new_active[col] = widget
+
+        self.active_widgets = new_active
+        for col, widget in new_active.items():
+            widget.setGeometry(self.MARGIN + col * self.slot_width, 0, self.BOOK_WIDTH, self.height())
+            if widget is not self.dragged_widget and widget.isHidden():
+                widget.show()
+
+    # 滚动区滚动时本控件会被移动
+    def moveEvent(self, event):
+        super().moveEvent(event)
+        self.update_visible()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_visible()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        viewport = self.parentWidget()
+        if viewport is not None and viewport is not self.viewport:
+            self.viewport = viewport
+            viewport.installEventFilter(self)
+        self.update_visible()
+
+    # 视口尺寸变化时可见范围也会变化
+    def eventFilter(self, obj, event):
+        if obj is self.viewport and event.type() == QEvent.Type.Resize:
+            self.update_visible()
+        return super().eventFilter(obj, event)
+
+    # 拖动时原位置留空即可，无需插入占位控件
+    def insert_placeholder_at(self, book_widget):
+        book_widget.hide()
+        self.dragged_widget = book_widget
+
+    def handle_drag_finished(self, drop_action):
+        if drop_action == Qt.DropAction.MoveAction:
+            self.main_window.refresh_view()
+        elif self.dragged_widget is not None:
+            # 拖动取消，恢复隐藏的控件显示
+            self.dragged_widget.show()
+            self.dragged_widget = None
+
+    # 判断插入位置：按固定列宽直接计算，与是否已创建控件无关
+    def estimate_insert_col(self, x_pos):
+        threshold = 10
+        rel = x_pos - self.MARGIN - self.BOOK_WIDTH / 2
+        col = int(rel // self.slot_width)  # 鼠标位于第 col 与 col+1 本书中线之间
+        for c in (col, col + 1):
+            if 0 <= c < len(self.books):
+                mid_x = self.MARGIN + c * self.slot_width + self.BOOK_WIDTH / 2
+                if mid_x - threshold < x_pos < mid_x + threshold:
+                    return -1
+        return max(0, min(col + 1, len(self.books)))
+
+    # 显示插入提示线
+    def show_insert_line(self, insert_col):
+        if not self.books:
+            self.insert_line.hide()
+            return
+
+        insert_col = max(0, min(insert_col, len(self.books)))
+        if insert_col == len(self.books):
+            x = self.MARGIN + (insert_col - 1) * self.slot_width + self.BOOK_WIDTH
+        else:
+            x = self.MARGIN + insert_col * self.slot_width
+
+        self.insert_line.move(int(x) - 8, 0)
+        self.insert_line.setFixedHeight(self.height())
+        self.insert_line.show()